@@ -158,7 +158,7 @@ async def api_analytics_overview(request: Request, user: str = Depends(get_curre
         metrics_30d = analytics.calculate_metrics(days=30)
         
         # Get performance by symbol
-        symbol_performance = analytics.get_performance_by_symbol(days=30)
+        symbol_performance = analytics.get_performance_by_symbol(days=30, top_k=None)
         
         return {
             "last_7_days": metrics_7d,
@@ -31,17 +31,14 @@ async def setup_analytics_commands(bot):
             # Initialize analytics
             analytics_engine = TradeAnalytics(bot.db)
             
+            # One fetch serves both the report and the symbol breakdown
+            snapshot = analytics_engine.snapshot(user_id=user_id, days=days)
+            
             # Generate report
-            report = analytics_engine.create_performance_report(
-                user_id=user_id,
-                days=days
-            )
+            report = snapshot.report
             
             # Get symbol performance if available
-            symbol_perf = analytics_engine.get_performance_by_symbol(
-                user_id=user_id,
-                days=days
-            )
+            symbol_perf = snapshot.by_symbol
             
             # Create embed
             embed = discord.Embed(
@@ -946,18 +946,14 @@ class HyperliquidConnector(BaseConnector):
         
         # 2. Previously discovered tick
         if symbol_upper in self._discovered_ticks:
-            tick = Decimal(self._discovered_ticks[symbol_upper])
-            if tick not in candidates:
-                candidates.append(tick)
+            candidates.append(Decimal(self._discovered_ticks[symbol_upper]))
         
         # 3. px_decimals-derived tick
         if px_decimals is not None:
-            tick = Decimal(10) ** (-int(px_decimals))
-            if tick not in candidates:
-                candidates.append(tick)
+            candidates.append(Decimal(10) ** (-int(px_decimals)))
         
         # 4. Common ticks (most → least common)
-        common = [
+        candidates.extend([
             Decimal('0.01'),    # Most common for altcoins
             Decimal('0.001'),   # Mid-cap
             Decimal('0.0001'),  # Small-cap
@@ -966,13 +962,10 @@ class HyperliquidConnector(BaseConnector):
             Decimal('0.00001'), # Micro-cap
             Decimal('0.1'),     # High-value
             Decimal('1.0'),     # Very high value
-        ]
+        ])
         
-        for tick in common:
-            if tick not in candidates:
-                candidates.append(tick)
-        
-        return candidates
+        # Remove duplicates while preserving priority order
+        return list(dict.fromkeys(candidates))
 
     async def _get_asset_mapping(self, session: aiohttp.ClientSession, testnet: bool) -> Dict[str, Dict[str, Any]]:
         """Fetch and cache asset metadata for symbol -> asset id lookups."""
@@ -1138,7 +1131,7 @@ class HyperliquidConnector(BaseConnector):
             "error": f"All {len(candidates[:8])} tick attempts failed for {symbol_upper}. Last error: {last_error}"
         }
 
-    @with_retry(max_attempts=3, backoff_base=2)
+    @with_retry(max_attempts=3, backoff_base=2, limiter=hyperliquid_limiter)
     @with_rate_limit(hyperliquid_limiter)
     async def _place_order(self, user_data: Dict, order_data: Dict) -> Dict[str, Any]:
         """Place order on Hyperliquid with retry and rate limiting"""
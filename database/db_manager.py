@@ -163,6 +163,17 @@ class DatabaseManager:
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_subscriptions_channel ON channel_subscriptions(channel_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_trades_user_id ON trades(user_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_trades_status ON trades(status)')
+            # Partial indexes matching the analytics filter on closed trades
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS ix_trades_closed_status
+                ON trades(user_id, status, closed_at DESC)
+                WHERE status IN ('closed', 'completed')
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS ix_trades_closed_symbol
+                ON trades(symbol, closed_at)
+                WHERE status IN ('closed', 'completed')
+            ''')
             
             # Clean up duplicate subscriptions before adding unique constraint
             cursor.execute('''
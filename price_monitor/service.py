@@ -5,6 +5,7 @@ from datetime import datetime
 from typing import Dict, List, Optional
 import discord
 from database.db_manager import DatabaseManager
+from utils.trade_analytics import TradeAnalytics
 from .monitor import PriceMonitor
 from .websocket_feed import HybridPriceFeed
 
@@ -255,6 +256,9 @@ class TradeMonitoringService:
                     rows_affected = cursor.rowcount
                     conn.commit()
             
+            if rows_affected > 0 and status in ('closed', 'completed'):
+                TradeAnalytics.invalidate_cache()
+            
             if rows_affected > 0:
                 logger.info(f"Updated trade {trade_id} status to '{status}' ({rows_affected} row(s))")
             else:
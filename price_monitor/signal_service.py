@@ -5,6 +5,7 @@ from ast import literal_eval
 from datetime import datetime
 from typing import Dict, List, Optional
 from database.db_manager import DatabaseManager
+from utils.trade_analytics import TradeAnalytics
 from .signal_monitor import SignalBasedPriceMonitor
 from .position_monitor import APIBasedPositionMonitor
 
@@ -285,6 +286,8 @@ class SignalBasedTradeService:
                     cursor.execute(query, trade_ids)
                     updated = cursor.rowcount
                 
+                TradeAnalytics.invalidate_cache()
+                
                 logger.info(f"✅ Marked {updated} trades as completed for signal {signal_id}")
                 
                 # Remove mapping
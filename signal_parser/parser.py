@@ -1,34 +1,105 @@
 import re
-from typing import Dict, Optional, List
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, Optional, List, Tuple
 from config import Config
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Common one-line signal formats, "LONG BTCUSDT @ 45000" (ls/sym1/p1) and
+# "BUY ETHUSDT 3000-3050" (bs/sym2/p2/p3), matched in a single search
+_RE_COMMON = re.compile(
+    r'(?:(?P<ls>LONG|SHORT)\s+(?P<sym1>[A-Z0-9\/\-]+)\s*@\s*(?P<p1>[\d.]+))'
+    r'|(?:(?P<bs>BUY|SELL)\s+(?P<sym2>[A-Z0-9\/\-]+)\s+(?P<p2>[\d.]+)-(?P<p3>[\d.]+))',
+    re.IGNORECASE
+)
+
+# Any side keyword; every parsed signal needs one (side pattern or common formats)
+_RE_SIDE_KEYWORD = re.compile(r'LONG|SHORT|BUY|SELL', re.IGNORECASE)
+
+# Joins messages in parse_batch (ASCII unit separator, never part of a signal)
+_BATCH_SEPARATOR = '\x1f'
+
+# Individual "Entry:" / "DCA2:" lines
+_RE_ENTRY_DCA_LINE = re.compile(r'^(?:Entry|DCA\d*)\s*:', re.IGNORECASE)
+
+# Bare leverage like "20x", "Leverage: 20x" or "20x Cross", used when the
+# configured leverage pattern finds nothing
+_RE_LEVERAGE_FALLBACK = re.compile(r'(?:leverage\s*:?\s*)?(\d+)x(?:\s+cross|\s+isolated)?', re.IGNORECASE)
+
+# Standalone price numbers (including decimals like 0.00662); numbers glued to a
+# letter on either side (TP1, 20x, ...) are rejected by the lookarounds
+_RE_PRICE_TOKEN = re.compile(r'(?<![^\W_])(?<!\d\.)(?>\d+(?:\.\d+)?)(?![^\W\d_])')
+
+# Line prefixes stripped before price extraction, in order: numbered list markers
+# ("1)", "2:", "3."), DCA labels (DCA, DCA2, ...), "Entry:" and section labels
+# ("TP1:", "Stop loss -"). Each part is optional so one pass handles stacked prefixes.
+_RE_LINE_PREFIX = re.compile(
+    r'^(?:\d+\s*(?:\)|:)\s*)?'
+    r'(?:\d+\s*\.(?!\d)\s*)?'
+    r'(?:DCA\d*\s*:\s*)?'
+    r'(?:Entry\s*:\s*)?'
+    r'(?:(?:tp|take\s*profit|target|targets|entries|sl|stop\s*loss|stop)\s*\d*\s*[:\-]\s*)?',
+    re.IGNORECASE
+)
+
+# Quote currency suffixes stripped by normalize_symbol
+_RE_QUOTE_SUFFIX = re.compile(r'[/\-](USD[T]?|PERP)$', re.IGNORECASE)
+_RE_SUFFIX = re.compile(r'(USDT|USD|PERP)$', re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def _normalize_symbol_cached(symbol: str) -> str:
+    """Memoized implementation of SignalParser.normalize_symbol"""
+    # Remove common separators and quote currencies
+    symbol = symbol.upper().strip()
+    
+    # Remove /USD, /USDT, -USD, -USDT suffixes
+    symbol = _RE_QUOTE_SUFFIX.sub('', symbol)
+    
+    # Remove USDT, USD suffix if directly attached (e.g., BTCUSDT -> BTC)
+    symbol = _RE_SUFFIX.sub('', symbol)
+    
+    return symbol.upper()
+
+
 class SignalParser:
+    __slots__ = ('patterns', '_compiled')
+
     SECTION_KEYWORDS = {
-        'entry': [
+        'entry': (
             'entry', 'entries', 'entry zone', 'entry zones', 'entry price', 'entry prices',
             'buy zone', 'buy zones', 'buy area', 'entry range', 'entry ranges',
             'cmp', 'current market price', 'dca', 'dca2', 'dca3', 'dca4', 'dca5'
-        ],
-        'take_profit': [
+        ),
+        'take_profit': (
             'take profit', 'take profits', 'tp', 'targets', 'target', 'profit targets'
-        ],
-        'stop_loss': [
+        ),
+        'stop_loss': (
             'stop loss', 'stop losses', 'stop', 'sl', 'stop price'
-        ]
+        )
     }
 
-    SECTION_BOUNDARY_KEYWORDS = [
+    SECTION_BOUNDARY_KEYWORDS = (
         'entry', 'entries', 'entry zone', 'entry zones', 'entry price', 'entry prices',
         'entry range', 'entry ranges', 'take profit', 'take profits', 'tp', 'targets',
         'target', 'profit targets', 'stop loss', 'stop losses', 'stop', 'sl',
         'leverage', 'lev', 'risk', 'notes', 'comment', 'analysis'
-    ]
+    )
+
+    # Lowercased keyword tables and compiled (header, boundary) regexes per
+    # SECTION_KEYWORDS entry, filled once by _compile_section_patterns()
+    _SECTION_KEYWORDS_LOWER: Dict[str, Tuple[str, ...]] = {}
+    _BOUNDARY_LOWER: Tuple[str, ...] = ()
+    _SECTION_RE: Dict[str, Optional[Tuple[re.Pattern, Optional[re.Pattern]]]] = {}
 
     def __init__(self):
         self.patterns = Config.SIGNAL_PATTERNS
+        self._compiled = {
+            name: re.compile(pattern, re.IGNORECASE)
+            for name, pattern in self.patterns.items()
+        }
     
     @staticmethod
     def normalize_symbol(symbol: str) -> str:
@@ -39,16 +110,7 @@ class SignalParser:
         if not symbol:
             return symbol
         
-        # Remove common separators and quote currencies
-        symbol = symbol.upper().strip()
-        
-        # Remove /USD, /USDT, -USD, -USDT suffixes
-        symbol = re.sub(r'[/\-](USD[T]?|PERP)$', '', symbol, flags=re.IGNORECASE)
-        
-        # Remove USDT, USD suffix if directly attached (e.g., BTCUSDT -> BTC)
-        symbol = re.sub(r'(USDT|USD|PERP)$', '', symbol, flags=re.IGNORECASE)
-        
-        return symbol.upper()
+        return _normalize_symbol_cached(symbol)
     
     def parse_signal(self, message_content: str) -> List[Dict]:
         """Parse trading signals from message content, supporting multiple signals separated by '/'"""
@@ -97,6 +159,38 @@ class SignalParser:
         
         return signals
     
+    def parse_batch(self, messages: List[str]) -> List[List[Dict]]:
+        """
+        Parse a burst of messages, returning one signal list per message.
+
+        The messages are joined and scanned once for side keywords; messages
+        without one cannot produce a signal and skip the full parse.
+        """
+        if any(_BATCH_SEPARATOR in message for message in messages):
+            return [self.parse_signal(message) for message in messages]
+
+        offsets = []
+        position = 0
+        for message in messages:
+            offsets.append(position)
+            position += len(message) + 1
+
+        buffer = _BATCH_SEPARATOR.join(messages)
+        candidates = set()
+        match = _RE_SIDE_KEYWORD.search(buffer)
+        while match:
+            index = bisect_right(offsets, match.start()) - 1
+            candidates.add(index)
+            if index + 1 >= len(offsets):
+                break
+            # One hit is enough, continue with the next message
+            match = _RE_SIDE_KEYWORD.search(buffer, offsets[index + 1])
+
+        return [
+            self.parse_signal(message) if index in candidates else []
+            for index, message in enumerate(messages)
+        ]
+    
     def _parse_price_levels(self, text: str) -> List[float]:
         """Parse price levels from text, handling numbered lists, ranges, CMP, DCA formats, and plain numbers"""
         if not text:
@@ -115,23 +209,8 @@ class SignalParser:
             if not cleaned_line:
                 continue
             
-            # Remove numbered prefixes like "1)", "2:", etc.
-            cleaned_line = re.sub(r'^\d+\s*(?:\)|:)\s*', '', cleaned_line)
-            cleaned_line = re.sub(r'^\d+\s*\.(?!\d)\s*', '', cleaned_line)
-            
-            # Remove DCA prefixes (including DCA2, DCA3, etc.)
-            cleaned_line = re.sub(r'DCA\d*\s*:\s*', '', cleaned_line, flags=re.IGNORECASE)
-            
-            # Remove Entry: prefixes that appear multiple times
-            cleaned_line = re.sub(r'^Entry\s*:\s*', '', cleaned_line, flags=re.IGNORECASE)
-            
-            # Remove other section prefixes
-            cleaned_line = re.sub(
-                r'^(?:tp|take\s*profit|target|targets|entries|sl|stop\s*loss|stop)\s*\d*\s*[:\-]\s*',
-                '',
-                cleaned_line,
-                flags=re.IGNORECASE
-            )
+            # Remove numbered, DCA, Entry and section prefixes in a single pass
+            cleaned_line = _RE_LINE_PREFIX.sub('', cleaned_line, count=1)
             
             if cleaned_line.strip():
                 cleaned_segments.append(cleaned_line)
@@ -149,20 +228,7 @@ class SignalParser:
         
         # Extract all price numbers (including decimals like 0.00662)
         prices = []
-        price_matches = re.finditer(r'\d+(?:\.\d+)?', cleaned_text)
-
-        for match in price_matches:
-            value_str = match.group(0)
-            start, end = match.span()
-            before = cleaned_text[start - 1] if start > 0 else ''
-            after = cleaned_text[end] if end < len(cleaned_text) else ''
-
-            # Skip if the number is part of a word or date
-            if before and before.isalpha():
-                continue
-            if after and after.isalpha():
-                continue
-
+        for value_str in _RE_PRICE_TOKEN.findall(cleaned_text):
             try:
                 value = float(value_str)
                 if value > 0:
@@ -171,12 +237,7 @@ class SignalParser:
                 continue
 
         # Remove duplicates while preserving order
-        unique_prices = []
-        for price in prices:
-            if price not in unique_prices:
-                unique_prices.append(price)
-
-        return unique_prices
+        return list(dict.fromkeys(prices))
     
     def _parse_single_signal(self, message_content: str) -> Optional[Dict]:
         """Parse a single trading signal from message content"""
@@ -186,7 +247,7 @@ class SignalParser:
         message_content = message_content.strip()
         
         # Extract symbol first as it's critical
-        symbol_match = re.search(self.patterns['symbol'], message_content, re.IGNORECASE)
+        symbol_match = self._compiled['symbol'].search(message_content)
         if symbol_match:
             raw_symbol = symbol_match.group(1).strip().upper()
             signal['symbol'] = self.normalize_symbol(raw_symbol)
@@ -205,7 +266,7 @@ class SignalParser:
                     break
         
         # Extract side (LONG/SHORT/BUY/SELL)
-        side_match = re.search(self.patterns['side'], message_content, re.IGNORECASE)
+        side_match = self._compiled['side'].search(message_content)
         if side_match:
             side = side_match.group(1).upper()
             if side in ['LONG', 'BUY']:
@@ -214,22 +275,19 @@ class SignalParser:
                 signal['side'] = 'sell'
         
         # Extract entry prices - handle multiple "Entry:" lines and DCA entries
-        entry_text = self._extract_section(
-            message_content,
-            self.SECTION_KEYWORDS.get('entry', [])
-        )
+        entry_text = self._extract_section(message_content, 'entry')
         
         # Also look for individual "Entry:" lines and DCA entries
         entry_lines = []
         for line in message_content.splitlines():
             line = line.strip()
-            if re.match(r'^(?:Entry|DCA\d*)\s*:', line, re.IGNORECASE):
+            if _RE_ENTRY_DCA_LINE.match(line):
                 entry_lines.append(line)
         
         if entry_lines:
             entry_text = '\n'.join(entry_lines) + '\n' + (entry_text or '')
         elif not entry_text:
-            entry_match = re.search(self.patterns['entry'], message_content, re.IGNORECASE)
+            entry_match = self._compiled['entry'].search(message_content)
             if entry_match:
                 entry_text = entry_match.group(1).strip()
                 
@@ -239,12 +297,9 @@ class SignalParser:
                 signal['entry'] = entry_prices
 
         # Extract stop loss
-        sl_text = self._extract_section(
-            message_content,
-            self.SECTION_KEYWORDS.get('stop_loss', [])
-        )
+        sl_text = self._extract_section(message_content, 'stop_loss')
         if not sl_text:
-            sl_match = re.search(self.patterns['stop_loss'], message_content, re.IGNORECASE)
+            sl_match = self._compiled['stop_loss'].search(message_content)
             if sl_match:
                 sl_text = sl_match.group(1).strip()
         if sl_text:
@@ -253,12 +308,9 @@ class SignalParser:
                 signal['stop_loss'] = sl_prices
 
         # Extract take profit
-        tp_text = self._extract_section(
-            message_content,
-            self.SECTION_KEYWORDS.get('take_profit', [])
-        )
+        tp_text = self._extract_section(message_content, 'take_profit')
         if not tp_text:
-            tp_match = re.search(self.patterns['take_profit'], message_content, re.IGNORECASE)
+            tp_match = self._compiled['take_profit'].search(message_content)
             if tp_match:
                 tp_text = tp_match.group(1).strip()
         if tp_text:
@@ -267,10 +319,10 @@ class SignalParser:
                 signal['take_profit'] = tp_prices
         
         # Extract leverage - handle formats like "20x", "Leverage: 20x", "20x Cross"
-        lev_match = re.search(self.patterns['leverage'], message_content, re.IGNORECASE)
+        lev_match = self._compiled['leverage'].search(message_content)
         if not lev_match:
             # Try alternative leverage patterns
-            lev_match = re.search(r'(?:leverage\s*:?\s*)?(\d+)x(?:\s+cross|\s+isolated)?', message_content, re.IGNORECASE)
+            lev_match = _RE_LEVERAGE_FALLBACK.search(message_content)
         
         if lev_match:
             try:
@@ -278,81 +330,114 @@ class SignalParser:
             except (ValueError, IndexError):
                 pass
         
-        # Additional parsing for common signal formats
-        signal = self._parse_common_formats(message_content, signal)
+        # Additional parsing for common signal formats (skipped when already complete)
+        if not ('symbol' in signal and 'side' in signal and signal.get('entry')):
+            signal = self._parse_common_formats(message_content, signal)
         
         # Only return signal if we have minimum required fields
         if 'symbol' in signal and 'side' in signal:
-            logger.info(f"Parsed signal: {signal}")
+            logger.info("Parsed signal: %s", signal)
             return signal
         
-        logger.debug(f"Could not parse signal from: {message_content[:100]}...")
+        logger.debug("Could not parse signal from: %.100s...", message_content)
         return None
 
-    def _extract_section(self, message: str, keywords: List[str], stop_keywords: Optional[List[str]] = None) -> Optional[str]:
-        if not message or not keywords:
-            return None
+    @classmethod
+    def _compile_section_patterns(cls):
+        """Normalize the keyword tables and build the per-section regexes once, at import time"""
+        cls._BOUNDARY_LOWER = tuple(kw.lower() for kw in cls.SECTION_BOUNDARY_KEYWORDS if kw)
+        cls._SECTION_KEYWORDS_LOWER = {
+            name: tuple(kw.lower() for kw in keywords if kw)
+            for name, keywords in cls.SECTION_KEYWORDS.items()
+        }
+        cls._SECTION_RE = {
+            name: cls._compile_section_pattern(keywords, cls._BOUNDARY_LOWER)
+            for name, keywords in cls._SECTION_KEYWORDS_LOWER.items()
+        }
 
-        keyword_set = [kw for kw in keywords if kw]
-        if not keyword_set:
-            return None
+    @staticmethod
+    def _compile_section_pattern(
+        keywords: Tuple[str, ...],
+        stop_keywords: Tuple[str, ...]
+    ) -> Optional[Tuple[re.Pattern, Optional[re.Pattern]]]:
+        """
+        Compile a section as a (header, boundary) regex pair from lowercased keywords.
 
-        if stop_keywords is None:
-            stop_keywords = self.SECTION_BOUNDARY_KEYWORDS
+        The section body runs from the end of the header match to the next
+        boundary line (or the end of the message). Both patterns are anchored
+        to line starts and only allow horizontal whitespace, so no match
+        attempt can run across lines; together with searching for the two
+        separately, this bounds matching time on untrusted message text.
+        """
+        if not keywords:
+            return None
 
-        normalized_keywords = {kw.lower() for kw in keyword_set}
-        boundary_keywords = [
-            kw for kw in stop_keywords
-            if kw and kw.lower() not in normalized_keywords
-        ]
+        boundary_keywords = [kw for kw in stop_keywords if kw not in keywords]
 
-        keyword_pattern = '|'.join(re.escape(kw) for kw in keyword_set)
+        keyword_pattern = '|'.join(re.escape(kw) for kw in keywords)
         boundary_pattern = '|'.join(re.escape(kw) for kw in boundary_keywords) if boundary_keywords else ''
 
+        # [^\S\n] is whitespace other than newline
+        header_re = re.compile(
+            rf'^[^\S\n]*(?:{keyword_pattern})[^\S\n]*(?:[:\-][^\S\n]*)?',
+            re.IGNORECASE | re.MULTILINE
+        )
+        boundary_re = None
         if boundary_pattern:
-            pattern = rf'(?:^|\n)\s*(?:{keyword_pattern})\s*(?:[:\-]\s*)?(.*?)(?=\n\s*(?:{boundary_pattern})(?:\s*[:\-]|$)|\Z)'
-        else:
-            pattern = rf'(?:^|\n)\s*(?:{keyword_pattern})\s*(?:[:\-]\s*)?(.*)'
+            # A bare boundary keyword only ends the section on the message's
+            # last line (the non-MULTILINE meaning of $), as before
+            boundary_re = re.compile(
+                rf'^[^\S\n]*(?:{boundary_pattern})(?:[^\S\n]*[:\-]|(?=\n?\Z))',
+                re.IGNORECASE | re.MULTILINE
+            )
 
-        match = re.search(pattern, message, re.IGNORECASE | re.DOTALL)
-        if match:
-            extracted = match.group(1).strip()
-            return extracted if extracted else None
-        return None
+        return header_re, boundary_re
+
+    def _extract_section(self, message: str, section: str) -> Optional[str]:
+        if not message:
+            return None
+
+        section_re = self._SECTION_RE.get(section)
+        if section_re is None:
+            return None
+
+        header_re, boundary_re = section_re
+        header = header_re.search(message)
+        if not header:
+            return None
+
+        start = header.end()
+        end = len(message)
+        if boundary_re is not None:
+            boundary = boundary_re.search(message, start)
+            if boundary:
+                end = boundary.start()
+
+        extracted = message[start:end].strip()
+        return extracted if extracted else None
     
     def _parse_common_formats(self, message: str, signal: Dict) -> Dict:
         """Parse common signal formats"""
+        match = _RE_COMMON.search(message)
+        if not match:
+            return signal
         
-        # Format: "LONG BTCUSDT @ 45000"
-        long_short_pattern = r'(LONG|SHORT)\s+([A-Z0-9\/\-]+)\s*[@]\s*([\d.]+)'
-        match = re.search(long_short_pattern, message, re.IGNORECASE)
-        if match:
-            side = 'buy' if match.group(1).upper() == 'LONG' else 'sell'
-            raw_symbol = match.group(2).upper()
-            symbol = self.normalize_symbol(raw_symbol)
-            entry_price = float(match.group(3))
-            
-            signal.update({
-                'side': side,
-                'symbol': symbol,
-                'entry': [entry_price]
-            })
+        if match.group('ls'):
+            # Format: "LONG BTCUSDT @ 45000"
+            side = 'buy' if match.group('ls').upper() == 'LONG' else 'sell'
+            raw_symbol = match.group('sym1').upper()
+            entry = [float(match.group('p1'))]
+        else:
+            # Format: "BUY ETHUSDT 3000-3050"
+            side = 'buy' if match.group('bs').upper() == 'BUY' else 'sell'
+            raw_symbol = match.group('sym2').upper()
+            entry = [float(match.group('p2')), float(match.group('p3'))]
         
-        # Format: "BUY ETHUSDT 3000-3050"
-        range_pattern = r'(BUY|SELL)\s+([A-Z0-9\/\-]+)\s+([\d.]+)-([\d.]+)'
-        match = re.search(range_pattern, message, re.IGNORECASE)
-        if match:
-            side = 'buy' if match.group(1).upper() == 'BUY' else 'sell'
-            raw_symbol = match.group(2).upper()
-            symbol = self.normalize_symbol(raw_symbol)
-            entry_low = float(match.group(3))
-            entry_high = float(match.group(4))
-            
-            signal.update({
-                'side': side,
-                'symbol': symbol,
-                'entry': [entry_low, entry_high]
-            })
+        signal.update({
+            'side': side,
+            'symbol': self.normalize_symbol(raw_symbol),
+            'entry': entry
+        })
         
         return signal
     
@@ -380,4 +465,7 @@ class SignalParser:
         if signal.get('leverage'):
             summary += f"\n⚡ Leverage: {signal['leverage']}x"
         
-        return summary
\ No newline at end of file
+        return summary
+
+
+SignalParser._compile_section_patterns()
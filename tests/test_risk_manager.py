@@ -0,0 +1,35 @@
+"""
+Tests for utils.risk_manager
+"""
+import pytest
+
+from utils.risk_manager import validate_risk_reward, validate_trade, validate_trades_batch
+
+
+def test_validate_trades_batch_uses_first_tp_of_list():
+    entries = [100.0, 100.0, 50.0]
+    stops = [95.0, 95.0, 52.0]
+    take_profits = [[110.0, 120.0], [], [46.0, 40.0]]
+    
+    result = validate_trades_batch(
+        [1000.0] * 3, entries, stops, take_profits, [5] * 3
+    )
+    
+    for i, (entry, stop, tp) in enumerate(zip(entries, stops, take_profits)):
+        rr_check = validate_risk_reward(entry, stop, list(tp))
+        assert result['risk_reward'][i] == rr_check['ratio']
+        
+        trade = validate_trade(1000.0, entry, stop, list(tp), 5)
+        assert result['valid'][i] == trade['valid']
+        assert result['position_size'][i] == trade['position_size']
+
+
+def test_validate_trades_batch_rejects_mismatched_lengths():
+    with pytest.raises(ValueError):
+        validate_trades_batch(
+            [1000.0, 1000.0], [100.0, 100.0], [95.0], [110.0, 110.0], [5, 5]
+        )
+    with pytest.raises(ValueError):
+        validate_trades_batch(
+            [1000.0], [100.0], [95.0], [110.0], [5], risk_percents=[1.0, 2.0]
+        )
@@ -0,0 +1,28 @@
+"""
+Tests for signal_parser.parser
+"""
+import time
+
+from signal_parser.parser import SignalParser
+
+
+def test_extract_section_stays_fast_on_whitespace_heavy_message():
+    parser = SignalParser()
+    # Telegram-sized runs of "\n " used to backtrack quadratically in the section regexes
+    message = 'LONG BTC' + '\n ' * 8000 + 'x'
+    
+    start = time.perf_counter()
+    for section in ('entry', 'take_profit', 'stop_loss'):
+        assert parser._extract_section(message, section) is None
+    parser.parse_signal(message)
+    
+    assert time.perf_counter() - start < 0.5
+
+
+def test_extract_section_bounds_sections_by_header_lines():
+    parser = SignalParser()
+    message = "LONG BTCUSDT\n  Entry:  45000 - 45500\nTP: 46000, 47000\n SL - 44000"
+    
+    assert parser._extract_section(message, 'entry') == '45000 - 45500'
+    assert parser._extract_section(message, 'take_profit') == '46000, 47000'
+    assert parser._extract_section(message, 'stop_loss') == '44000'
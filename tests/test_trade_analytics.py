@@ -0,0 +1,110 @@
+"""
+Tests for utils.trade_analytics
+"""
+from contextlib import contextmanager
+
+import pytest
+
+from utils.trade_analytics import TradeAnalytics
+
+
+class _FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.rows = []
+    
+    def execute(self, query, params):
+        for marker, rows in self.db.responses:
+            if marker in query:
+                if isinstance(rows, Exception):
+                    raise rows
+                self.rows = rows
+                return
+        self.rows = []
+    
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+    
+    def fetchall(self):
+        return list(self.rows)
+    
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class _FakeConnection:
+    def __init__(self, db):
+        self.db = db
+    
+    def cursor(self, name=None):
+        return _FakeCursor(self.db)
+
+
+class _FakeDB:
+    """Answers each query with the rows of the first marker found in its SQL"""
+    
+    def __init__(self, responses):
+        self.responses = responses
+    
+    @contextmanager
+    def get_connection(self):
+        yield _FakeConnection(self)
+
+
+_AGGREGATE_ROW = [(3, 2, 1, 30.0, -5.0, 20.0, -5.0)]
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    TradeAnalytics.invalidate_cache()
+    yield
+    TradeAnalytics.invalidate_cache()
+
+
+def test_calculate_metrics_fails_when_pnl_series_query_fails():
+    db = _FakeDB([
+        ('COUNT(*)', _AGGREGATE_ROW),
+        ('ORDER BY closed_at', RuntimeError('connection lost')),
+        ('date_trunc', []),
+    ])
+    
+    metrics = TradeAnalytics(db).calculate_metrics(days=30)
+    
+    assert metrics['error'] == 'connection lost'
+    assert metrics['total_trades'] == 0
+
+
+def test_calculate_metrics_uses_aggregates_and_series():
+    db = _FakeDB([
+        ('COUNT(*)', _AGGREGATE_ROW),
+        ('ORDER BY closed_at', [(10.0,), (-5.0,), (20.0,)]),
+        ('date_trunc', []),
+    ])
+    
+    metrics = TradeAnalytics(db).calculate_metrics(days=30)
+    
+    assert 'error' not in metrics
+    assert metrics['total_trades'] == 3
+    assert metrics['consecutive_stats']['max_consecutive_wins'] == 1
+
+
+def test_failed_metrics_are_not_cached():
+    db = _FakeDB([('COUNT(*)', RuntimeError('connection lost'))])
+    analytics = TradeAnalytics(db)
+    assert 'error' in analytics.calculate_metrics(days=30)
+    
+    db.responses = [('COUNT(*)', [(0, 0, 0, 0, 0, 0, 0)])]
+    metrics = analytics.calculate_metrics(days=30)
+    assert 'error' not in metrics
+    assert metrics['total_trades'] == 0
+
+
+def test_failed_symbol_performance_is_reported_and_not_cached():
+    db = _FakeDB([('GROUP BY symbol', RuntimeError('connection lost'))])
+    analytics = TradeAnalytics(db)
+    assert analytics.get_performance_by_symbol(days=30) == {'error': 'connection lost'}
+    
+    db.responses = [('GROUP BY symbol', [('BTC', 2, 1, 1, 15.0)])]
+    by_symbol = analytics.get_performance_by_symbol(days=30)
+    assert by_symbol['BTC']['total_trades'] == 2
+    assert by_symbol['BTC']['total_pnl'] == 15.0
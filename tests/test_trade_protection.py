@@ -0,0 +1,104 @@
+"""
+Tests for utils.trade_protection
+"""
+import asyncio
+import time
+
+import pytest
+
+from utils.trade_protection import AsyncBatcher, RateLimiter, SlippageProtection, with_retry
+
+
+def _timed_acquire(limiter: RateLimiter) -> float:
+    """Seconds one acquire() takes on a fresh event loop"""
+    async def run():
+        start = time.monotonic()
+        await limiter.acquire()
+        return time.monotonic() - start
+    return asyncio.run(run())
+
+
+def test_acquire_waits_new_interval_after_on_failure():
+    limiter = RateLimiter(calls_per_second=10, burst=20, decrease_factor=0.5)
+    assert limiter.try_acquire_nowait()
+    
+    limiter.on_failure()
+    assert limiter.calls_per_second == 5
+    
+    waited = _timed_acquire(limiter)
+    assert 0.15 <= waited <= 0.35
+
+
+def test_set_rate_increase_releases_owed_spacing():
+    limiter = RateLimiter(calls_per_second=1, burst=1)
+    assert limiter.try_acquire_nowait()
+    assert not limiter.try_acquire_nowait()
+    
+    limiter.set_rate(100)
+    assert limiter.try_acquire_nowait()
+
+
+@pytest.mark.parametrize('max_attempts', [0, -1])
+def test_with_retry_rejects_max_attempts_below_one(max_attempts):
+    with pytest.raises(ValueError):
+        with_retry(max_attempts=max_attempts)
+    with pytest.raises(ValueError):
+        with_retry(max_attempts=max_attempts, limiter=RateLimiter())
+
+
+def test_with_retry_single_attempt_with_limiter_calls_func():
+    calls = []
+    
+    @with_retry(max_attempts=1, limiter=RateLimiter())
+    async def call():
+        calls.append(1)
+        return 'ok'
+    
+    assert asyncio.run(call()) == 'ok'
+    assert calls == [1]
+
+
+def test_calculate_slippage_batch_matches_scalar_on_bad_prices():
+    nan, inf = float('nan'), float('inf')
+    fills = [
+        (100.0, 100.2, 'buy'),
+        (100.0, 101.0, 'sell'),
+        (0.0, 100.0, 'buy'),
+        (100.0, 0.0, 'sell'),
+        (nan, 100.0, 'buy'),
+        (100.0, nan, 'sell'),
+        (inf, 100.0, 'buy'),
+        (100.0, inf, 'buy'),
+        (-inf, 100.0, 'sell'),
+    ]
+    expected_prices, actual_prices, sides = zip(*fills)
+    
+    batch = SlippageProtection.calculate_slippage_batch(expected_prices, actual_prices, sides)
+    
+    for i, (expected_price, actual_price, side) in enumerate(fills):
+        scalar = SlippageProtection.calculate_slippage(expected_price, actual_price, side)
+        assert batch['valid'][i] == scalar['valid']
+        assert batch['slippage_percent'][i] == pytest.approx(scalar['slippage_percent'])
+        assert batch['favorable'][i] == scalar.get('favorable', False)
+
+
+def test_async_batcher_cancelled_flush_cancels_submitters():
+    async def run():
+        flush_started = asyncio.Event()
+        
+        async def flush_call(items):
+            flush_started.set()
+            await asyncio.sleep(10)
+            return items
+        
+        batcher = AsyncBatcher(flush_call, max_batch=2, max_delay=0.01)
+        submits = [asyncio.ensure_future(batcher.submit(i)) for i in range(2)]
+        await asyncio.wait_for(flush_started.wait(), 1)
+        
+        for flush in list(batcher._flushes):
+            flush.cancel()
+        
+        return await asyncio.wait_for(asyncio.gather(*submits, return_exceptions=True), 1)
+    
+    results = asyncio.run(run())
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
@@ -1881,8 +1881,8 @@ class AnalyticsView(discord.ui.View):
 ╰─ Current Streak: {metrics['consecutive_stats']['current_streak']}"""
                 
                 # Add symbol performance if available
-                symbol_perf = analytics.get_performance_by_symbol(int(user_id), days=30)
-                if symbol_perf:
+                symbol_perf = analytics.get_performance_by_symbol(int(user_id), days=30, top_k=3)
+                if symbol_perf and 'error' not in symbol_perf:
                     message += "\n\n**📈 Top Symbols:**"
                     for i, (symbol, data) in enumerate(list(symbol_perf.items())[:3], 1):
                         pnl_sym = data['total_pnl']
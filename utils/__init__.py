@@ -7,8 +7,12 @@ from .risk_manager import RiskManager
 from .trade_protection import (
     SlippageProtection,
     RateLimiter,
+    RateLimiterGroup,
+    AsyncBatcher,
     with_retry,
     with_rate_limit,
+    with_rate_limit_for,
+    get_limiter,
     hyperliquid_limiter,
     bybit_limiter
 )
@@ -19,8 +23,12 @@ __all__ = [
     'RiskManager',
     'SlippageProtection',
     'RateLimiter',
+    'RateLimiterGroup',
+    'AsyncBatcher',
     'with_retry',
     'with_rate_limit',
+    'with_rate_limit_for',
+    'get_limiter',
     'hyperliquid_limiter',
     'bybit_limiter',
     'PartialFillHandler',
@@ -3,11 +3,18 @@ Partial Fill Handler
 Detects and manages partially filled orders
 """
 import logging
+import time
+from collections import deque
 from typing import Dict, List, Optional
-from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Fill thresholds (fraction of expected size), also precomputed as percentages
+_PARTIAL_FILL_THRESHOLD = 0.95
+_MINIMUM_FILL_THRESHOLD = 0.10
+_PARTIAL_FILL_PERCENT = _PARTIAL_FILL_THRESHOLD * 100
+_MINIMUM_FILL_PERCENT = _MINIMUM_FILL_THRESHOLD * 100
+
 class PartialFillHandler:
     """
     Handles detection and management of partially filled orders
@@ -16,13 +23,16 @@ class PartialFillHandler:
     Example: You place an order for 1 BTC but only 0.6 BTC is filled.
     """
     
+    __slots__ = ('bot', 'tracked_fills', '_fill_order')
+    
     # Thresholds
-    PARTIAL_FILL_THRESHOLD = 0.95  # 95% - below this is considered partial
-    MINIMUM_FILL_THRESHOLD = 0.10  # 10% - below this is too small
+    PARTIAL_FILL_THRESHOLD = _PARTIAL_FILL_THRESHOLD  # 95% - below this is considered partial
+    MINIMUM_FILL_THRESHOLD = _MINIMUM_FILL_THRESHOLD  # 10% - below this is too small
     
     def __init__(self, bot):
         self.bot = bot
         self.tracked_fills = {}  # {order_id: fill_data}
+        self._fill_order = deque()  # (timestamp, order_id) in tracking order
     
     def check_fill_status(
         self,
@@ -41,72 +51,66 @@ class PartialFillHandler:
         Returns:
             Dict with fill status
         """
-        try:
-            if expected_size <= 0:
-                return {
-                    'status': 'invalid',
-                    'error': 'Invalid expected size',
-                    'fill_percent': 0
-                }
-            
-            # Calculate fill percentage
-            fill_percent = (actual_size / expected_size) * 100
-            
-            # Determine fill status
-            if fill_percent >= self.PARTIAL_FILL_THRESHOLD * 100:
-                status = 'full'
-                severity = 'success'
-            elif fill_percent >= self.MINIMUM_FILL_THRESHOLD * 100:
-                status = 'partial'
-                severity = 'warning'
-            elif fill_percent > 0:
-                status = 'minimal'
-                severity = 'error'
-            else:
-                status = 'unfilled'
-                severity = 'error'
-            
-            result = {
-                'status': status,
-                'severity': severity,
-                'expected_size': round(expected_size, 6),
-                'actual_size': round(actual_size, 6),
-                'fill_percent': round(fill_percent, 2),
-                'unfilled_size': round(expected_size - actual_size, 6),
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            # Log appropriately based on severity
-            if status == 'full':
-                logger.info(f"✅ Order fully filled: {fill_percent:.1f}%")
-            elif status == 'partial':
-                logger.warning(
-                    f"⚠️ PARTIAL FILL detected: {fill_percent:.1f}%\n"
-                    f"   Expected: {expected_size:.6f}\n"
-                    f"   Filled: {actual_size:.6f}\n"
-                    f"   Remaining: {result['unfilled_size']:.6f}"
-                )
-            elif status == 'minimal':
-                logger.error(
-                    f"❌ MINIMAL FILL: Only {fill_percent:.1f}% filled\n"
-                    f"   This is too small to be useful"
-                )
-            else:
-                logger.error("❌ Order NOT FILLED")
-            
-            # Track this fill
-            if order_id:
-                self.tracked_fills[order_id] = result
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"Error checking fill status: {e}")
+        if expected_size <= 0:
             return {
-                'status': 'error',
-                'error': str(e),
+                'status': 'invalid',
+                'error': 'Invalid expected size',
                 'fill_percent': 0
             }
+        
+        # Calculate fill percentage
+        fill_percent = (actual_size / expected_size) * 100
+        
+        # Determine fill status
+        if fill_percent >= _PARTIAL_FILL_PERCENT:
+            status = 'full'
+            severity = 'success'
+        elif fill_percent >= _MINIMUM_FILL_PERCENT:
+            status = 'partial'
+            severity = 'warning'
+        elif fill_percent > 0:
+            status = 'minimal'
+            severity = 'error'
+        else:
+            status = 'unfilled'
+            severity = 'error'
+        
+        result = {
+            'status': status,
+            'severity': severity,
+            'expected_size': round(expected_size, 6),
+            'actual_size': round(actual_size, 6),
+            'fill_percent': round(fill_percent, 2),
+            'unfilled_size': round(expected_size - actual_size, 6),
+            'timestamp': time.time()  # epoch seconds
+        }
+        
+        # Log appropriately based on severity
+        if status == 'full':
+            logger.info("✅ Order fully filled: %.1f%%", fill_percent)
+        elif status == 'partial':
+            logger.warning(
+                "⚠️ PARTIAL FILL detected: %.1f%%\n"
+                "   Expected: %.6f\n"
+                "   Filled: %.6f\n"
+                "   Remaining: %.6f",
+                fill_percent, expected_size, actual_size, result['unfilled_size']
+            )
+        elif status == 'minimal':
+            logger.error(
+                "❌ MINIMAL FILL: Only %.1f%% filled\n"
+                "   This is too small to be useful",
+                fill_percent
+            )
+        else:
+            logger.error("❌ Order NOT FILLED")
+        
+        # Track this fill
+        if order_id:
+            self.tracked_fills[order_id] = result
+            self._fill_order.append((result['timestamp'], order_id))
+        
+        return result
     
     async def handle_partial_fill(
         self,
@@ -250,9 +254,9 @@ class PartialFillHandler:
         Returns:
             Dict with fill statistics
         """
-        fills = list(self.tracked_fills.values())
+        total = len(self.tracked_fills)
         
-        if not fills:
+        if not total:
             return {
                 'total_orders': 0,
                 'full_fills': 0,
@@ -260,19 +264,22 @@ class PartialFillHandler:
                 'avg_fill_percent': 0
             }
         
-        full_fills = [f for f in fills if f['status'] == 'full']
-        partial_fills = [f for f in fills if f['status'] == 'partial']
-        
-        avg_fill = sum(f['fill_percent'] for f in fills) / len(fills)
+        # Single pass over the tracked fills
+        counts = {'full': 0, 'partial': 0, 'minimal': 0, 'unfilled': 0}
+        fill_percent_sum = 0.0
+        for fill in self.tracked_fills.values():
+            status = fill['status']
+            counts[status] = counts.get(status, 0) + 1
+            fill_percent_sum += fill['fill_percent']
         
         return {
-            'total_orders': len(fills),
-            'full_fills': len(full_fills),
-            'partial_fills': len(partial_fills),
-            'minimal_fills': len([f for f in fills if f['status'] == 'minimal']),
-            'unfilled': len([f for f in fills if f['status'] == 'unfilled']),
-            'avg_fill_percent': round(avg_fill, 2),
-            'partial_fill_rate': round(len(partial_fills) / len(fills) * 100, 2)
+            'total_orders': total,
+            'full_fills': counts['full'],
+            'partial_fills': counts['partial'],
+            'minimal_fills': counts['minimal'],
+            'unfilled': counts['unfilled'],
+            'avg_fill_percent': round(fill_percent_sum / total, 2),
+            'partial_fill_rate': round(counts['partial'] / total * 100, 2)
         }
     
     def clear_old_fills(self, max_age_hours: int = 24):
@@ -282,19 +289,17 @@ class PartialFillHandler:
         Args:
             max_age_hours: Maximum age of records to keep
         """
-        cutoff = datetime.now().timestamp() - (max_age_hours * 3600)
-        
-        to_remove = []
-        for order_id, fill_data in self.tracked_fills.items():
-            try:
-                fill_time = datetime.fromisoformat(fill_data['timestamp']).timestamp()
-                if fill_time < cutoff:
-                    to_remove.append(order_id)
-            except:
-                pass
+        cutoff = time.time() - (max_age_hours * 3600)
         
-        for order_id in to_remove:
-            del self.tracked_fills[order_id]
+        # _fill_order is oldest-first, so only expired entries are visited
+        removed = 0
+        while self._fill_order and self._fill_order[0][0] < cutoff:
+            timestamp, order_id = self._fill_order.popleft()
+            fill_data = self.tracked_fills.get(order_id)
+            # Skip entries superseded by a newer check of the same order
+            if fill_data is not None and fill_data['timestamp'] == timestamp:
+                del self.tracked_fills[order_id]
+                removed += 1
         
-        if to_remove:
-            logger.info(f"🧹 Cleared {len(to_remove)} old fill records")
+        if removed:
+            logger.info(f"🧹 Cleared {removed} old fill records")
@@ -3,306 +3,433 @@ Risk Management Module
 Handles position sizing, risk calculations, and trade validation
 """
 import logging
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
-class RiskManager:
+# Shared error results for the fixed validation failures (read-only by convention)
+_ERR_INVALID_BALANCE = {'success': False, 'error': 'Invalid balance', 'position_size': 0}
+_ERR_INVALID_PRICES = {'success': False, 'error': 'Invalid prices', 'position_size': 0}
+_ERR_SAME_PRICES = {'success': False, 'error': 'Entry and stop loss cannot be the same', 'position_size': 0}
+_ERR_STOP_EQUALS_ENTRY = {'valid': False, 'error': 'Stop loss equals entry price', 'ratio': 0}
+
+
+def _log_position_details(
+    balance: float,
+    risk_percent: float,
+    risk_amount: float,
+    entry_price: float,
+    stop_loss: float,
+    price_distance: float,
+    risk_per_unit: float,
+    leverage: int,
+    leveraged_position_value: float,
+    position_size: float,
+    actual_risk: float,
+    actual_risk_percent: float
+):
+    """Log the position sizing breakdown (only formatted when INFO is enabled)"""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    logger.info(
+        "📊 Position Sizing:\n"
+        "   Balance: $%.2f\n"
+        "   Risk: %s%% = $%.2f\n"
+        "   Entry: $%.2f\n"
+        "   Stop Loss: $%.2f\n"
+        "   Distance: $%.2f (%.2f%%)\n"
+        "   Leverage: %sx\n"
+        "   Position Value: $%.2f\n"
+        "   Position Size: %.6f coins\n"
+        "   Actual Risk: $%.2f (%.2f%%)",
+        balance, risk_percent, risk_amount, entry_price, stop_loss,
+        price_distance, risk_per_unit * 100, leverage, leveraged_position_value,
+        position_size, actual_risk, actual_risk_percent
+    )
+
+
+def _log_risk_reward(
+    entry_price: float,
+    stop_loss: float,
+    risk_distance: float,
+    take_profit: float,
+    reward_distance: float,
+    rr_ratio: float,
+    meets_minimum: bool
+):
+    """Log the risk/reward analysis (only formatted when INFO is enabled)"""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    logger.info(
+        "📈 Risk/Reward Analysis:\n"
+        "   Entry: $%.2f\n"
+        "   Stop Loss: $%.2f (Risk: $%.2f)\n"
+        "   Take Profit: $%.2f (Reward: $%.2f)\n"
+        "   R/R Ratio: 1:%.2f\n"
+        "   Status: %s",
+        entry_price, stop_loss, risk_distance, take_profit, reward_distance,
+        rr_ratio, '✅ GOOD' if meets_minimum else '⚠️ LOW R/R'
+    )
+
+
+def calculate_position_size(
+    balance: float,
+    entry_price: float,
+    stop_loss: float,
+    risk_percent: float = None,
+    leverage: int = 1,
+    side: str = 'buy'
+) -> Dict:
     """
-    Manages risk and position sizing for trades
+    Calculate optimal position size based on risk management
     
-    Features:
-    - Dynamic position sizing based on account balance
-    - Risk-based calculations (% of account per trade)
-    - Stop-loss distance validation
-    - Leverage adjustment
-    - Maximum position limits
-    """
+    Formula:
+    1. Risk Amount = Balance × Risk%
+    2. Price Distance = |Entry - StopLoss|
+    3. Risk Per Unit = Price Distance / Entry Price
+    4. Position Value = Risk Amount / Risk Per Unit
+    5. Position Size = Position Value / Entry Price
     
-    # Default risk parameters
-    DEFAULT_RISK_PERCENT = 2.0  # Risk 2% of account per trade
-    MAX_RISK_PERCENT = 5.0  # Maximum 5% risk allowed
-    MIN_RISK_REWARD_RATIO = 1.5  # Minimum 1.5:1 R/R ratio
-    MAX_POSITION_PERCENT = 50.0  # Max 50% of account in single position
+    Args:
+        balance: Account balance in USD
+        entry_price: Entry price
+        stop_loss: Stop loss price
+        risk_percent: Percentage of balance to risk (default: 2%)
+        leverage: Leverage multiplier (default: 1x)
+        side: 'buy' or 'sell'
     
-    @staticmethod
-    def calculate_position_size(
-        balance: float,
-        entry_price: float,
-        stop_loss: float,
-        risk_percent: float = None,
-        leverage: int = 1,
-        side: str = 'buy'
-    ) -> Dict:
-        """
-        Calculate optimal position size based on risk management
+    Returns:
+        Dict with position details
+    """
+    try:
+        if risk_percent is None:
+            risk_percent = RiskManager.DEFAULT_RISK_PERCENT
+        
+        # Validate inputs
+        if balance <= 0:
+            return _ERR_INVALID_BALANCE
+        
+        if entry_price <= 0 or stop_loss <= 0:
+            return _ERR_INVALID_PRICES
+        
+        # Cap risk at maximum
+        if risk_percent > RiskManager.MAX_RISK_PERCENT:
+            logger.warning("Risk %s%% exceeds maximum, capping at %s%%", risk_percent, RiskManager.MAX_RISK_PERCENT)
+            risk_percent = RiskManager.MAX_RISK_PERCENT
         
-        Formula:
-        1. Risk Amount = Balance × Risk%
-        2. Price Distance = |Entry - StopLoss|
-        3. Risk Per Unit = Price Distance / Entry Price
-        4. Position Value = Risk Amount / Risk Per Unit
-        5. Position Size = Position Value / Entry Price
+        # Calculate risk amount in USD
+        risk_amount = balance * (risk_percent / 100)
         
-        Args:
-            balance: Account balance in USD
-            entry_price: Entry price
-            stop_loss: Stop loss price
-            risk_percent: Percentage of balance to risk (default: 2%)
-            leverage: Leverage multiplier (default: 1x)
-            side: 'buy' or 'sell'
+        # Calculate price distance to stop loss
+        price_distance = abs(entry_price - stop_loss)
         
-        Returns:
-            Dict with position details
-        """
-        try:
-            if risk_percent is None:
-                risk_percent = RiskManager.DEFAULT_RISK_PERCENT
-            
-            # Validate inputs
-            if balance <= 0:
-                return {
-                    'success': False,
-                    'error': 'Invalid balance',
-                    'position_size': 0
-                }
-            
-            if entry_price <= 0 or stop_loss <= 0:
-                return {
-                    'success': False,
-                    'error': 'Invalid prices',
-                    'position_size': 0
-                }
-            
-            # Cap risk at maximum
-            if risk_percent > RiskManager.MAX_RISK_PERCENT:
-                logger.warning(f"Risk {risk_percent}% exceeds maximum, capping at {RiskManager.MAX_RISK_PERCENT}%")
-                risk_percent = RiskManager.MAX_RISK_PERCENT
-            
-            # Calculate risk amount in USD
-            risk_amount = balance * (risk_percent / 100)
-            
-            # Calculate price distance to stop loss
-            price_distance = abs(entry_price - stop_loss)
-            
-            if price_distance == 0:
-                return {
-                    'success': False,
-                    'error': 'Entry and stop loss cannot be the same',
-                    'position_size': 0
-                }
-            
-            # Calculate risk per unit (as percentage)
-            risk_per_unit = price_distance / entry_price
-            
-            # Calculate position value needed
-            position_value = risk_amount / risk_per_unit
-            
-            # Apply leverage (increases position size)
-            leveraged_position_value = position_value * leverage
-            
-            # Log position size for user awareness (no longer enforcing maximum)
-            position_percent = (leveraged_position_value / balance) * 100
-            if position_percent > 100:
-                logger.warning(
-                    f"⚠️ Position {position_percent:.1f}% of balance - High risk position"
-                )
-            
-            # Calculate position size in coins
-            position_size = leveraged_position_value / entry_price
-            
-            # Calculate actual risk with final position size
-            actual_risk = position_size * price_distance
-            actual_risk_percent = (actual_risk / balance) * 100
-            
-            logger.info(
-                f"📊 Position Sizing:\n"
-                f"   Balance: ${balance:.2f}\n"
-                f"   Risk: {risk_percent}% = ${risk_amount:.2f}\n"
-                f"   Entry: ${entry_price:.2f}\n"
-                f"   Stop Loss: ${stop_loss:.2f}\n"
-                f"   Distance: ${price_distance:.2f} ({risk_per_unit*100:.2f}%)\n"
-                f"   Leverage: {leverage}x\n"
-                f"   Position Value: ${leveraged_position_value:.2f}\n"
-                f"   Position Size: {position_size:.6f} coins\n"
-                f"   Actual Risk: ${actual_risk:.2f} ({actual_risk_percent:.2f}%)"
+        if price_distance == 0:
+            return _ERR_SAME_PRICES
+        
+        # Calculate risk per unit (as percentage)
+        risk_per_unit = price_distance / entry_price
+        
+        # Calculate position value needed
+        position_value = risk_amount / risk_per_unit
+        
+        # Apply leverage (increases position size)
+        leveraged_position_value = position_value * leverage
+        
+        # Log position size for user awareness (no longer enforcing maximum)
+        position_percent = (leveraged_position_value / balance) * 100
+        if position_percent > 100:
+            logger.warning(
+                "⚠️ Position %.1f%% of balance - High risk position", position_percent
             )
-            
-            return {
-                'success': True,
-                'position_size': round(position_size, 6),
-                'position_value': round(leveraged_position_value, 2),
-                'risk_amount': round(risk_amount, 2),
-                'risk_percent': round(actual_risk_percent, 2),
-                'price_distance': round(price_distance, 2),
-                'risk_per_unit': round(risk_per_unit * 100, 2),  # As percentage
-                'position_percent': round(position_percent, 2)
-            }
-            
-        except Exception as e:
-            logger.error(f"Error calculating position size: {e}")
-            return {
-                'success': False,
-                'error': str(e),
-                'position_size': 0
-            }
+        
+        # Calculate position size in coins
+        position_size = leveraged_position_value / entry_price
+        
+        # Calculate actual risk with final position size
+        actual_risk = position_size * price_distance
+        actual_risk_percent = (actual_risk / balance) * 100
+        
+        _log_position_details(
+            balance, risk_percent, risk_amount, entry_price, stop_loss,
+            price_distance, risk_per_unit, leverage, leveraged_position_value,
+            position_size, actual_risk, actual_risk_percent
+        )
+        
+        return {
+            'success': True,
+            'position_size': round(position_size, 6),
+            'position_value': round(leveraged_position_value, 2),
+            'risk_amount': round(risk_amount, 2),
+            'risk_percent': round(actual_risk_percent, 2),
+            'price_distance': round(price_distance, 2),
+            'risk_per_unit': round(risk_per_unit * 100, 2),  # As percentage
+            'position_percent': round(position_percent, 2)
+        }
+    
+    except Exception as e:
+        logger.error(f"Error calculating position size: {e}")
+        return {
+            'success': False,
+            'error': str(e),
+            'position_size': 0
+        }
+
+
+def validate_risk_reward(
+    entry_price: float,
+    stop_loss: float,
+    take_profit: float,
+    side: str = 'buy'
+) -> Dict:
+    """
+    Validate risk/reward ratio
+    
+    Args:
+        entry_price: Entry price
+        stop_loss: Stop loss price
+        take_profit: Take profit price (can be single or list)
+        side: 'buy' or 'sell'
     
-    @staticmethod
-    def validate_risk_reward(
-        entry_price: float,
-        stop_loss: float,
-        take_profit: float,
-        side: str = 'buy'
-    ) -> Dict:
-        """
-        Validate risk/reward ratio
+    Returns:
+        Dict with R/R analysis
+    """
+    try:
+        # Handle multiple TPs (use first one)
+        if isinstance(take_profit, list):
+            take_profit = take_profit[0] if take_profit else entry_price
         
-        Args:
-            entry_price: Entry price
-            stop_loss: Stop loss price
-            take_profit: Take profit price (can be single or list)
-            side: 'buy' or 'sell'
+        # Calculate risk and reward distances
+        risk_distance = abs(entry_price - stop_loss)
+        reward_distance = abs(take_profit - entry_price)
         
-        Returns:
-            Dict with R/R analysis
-        """
-        try:
-            # Handle multiple TPs (use first one)
-            if isinstance(take_profit, list):
-                take_profit = take_profit[0] if take_profit else entry_price
-            
-            # Calculate risk and reward distances
-            risk_distance = abs(entry_price - stop_loss)
-            reward_distance = abs(take_profit - entry_price)
-            
-            if risk_distance == 0:
-                return {
-                    'valid': False,
-                    'error': 'Stop loss equals entry price',
-                    'ratio': 0
-                }
-            
-            # Calculate R/R ratio
-            rr_ratio = reward_distance / risk_distance
-            
-            # Check if it meets minimum requirements
-            meets_minimum = rr_ratio >= RiskManager.MIN_RISK_REWARD_RATIO
-            
-            logger.info(
-                f"📈 Risk/Reward Analysis:\n"
-                f"   Entry: ${entry_price:.2f}\n"
-                f"   Stop Loss: ${stop_loss:.2f} (Risk: ${risk_distance:.2f})\n"
-                f"   Take Profit: ${take_profit:.2f} (Reward: ${reward_distance:.2f})\n"
-                f"   R/R Ratio: 1:{rr_ratio:.2f}\n"
-                f"   Status: {'✅ GOOD' if meets_minimum else '⚠️ LOW R/R'}"
-            )
-            
-            return {
-                'valid': meets_minimum,
-                'ratio': round(rr_ratio, 2),
-                'risk_distance': round(risk_distance, 2),
-                'reward_distance': round(reward_distance, 2),
-                'recommendation': 'TAKE' if meets_minimum else 'SKIP (Low R/R)'
-            }
-            
-        except Exception as e:
-            logger.error(f"Error validating R/R: {e}")
-            return {
-                'valid': False,
-                'error': str(e),
-                'ratio': 0
-            }
+        if risk_distance == 0:
+            return _ERR_STOP_EQUALS_ENTRY
+        
+        # Calculate R/R ratio
+        rr_ratio = reward_distance / risk_distance
+        
+        # Check if it meets minimum requirements
+        meets_minimum = rr_ratio >= RiskManager.MIN_RISK_REWARD_RATIO
+        
+        _log_risk_reward(
+            entry_price, stop_loss, risk_distance,
+            take_profit, reward_distance, rr_ratio, meets_minimum
+        )
+        
+        return {
+            'valid': meets_minimum,
+            'ratio': round(rr_ratio, 2),
+            'risk_distance': round(risk_distance, 2),
+            'reward_distance': round(reward_distance, 2),
+            'recommendation': 'TAKE' if meets_minimum else 'SKIP (Low R/R)'
+        }
     
-    @staticmethod
-    def calculate_max_leverage(
-        balance: float,
-        position_value: float,
-        risk_percent: float = None
-    ) -> int:
-        """
-        Calculate maximum safe leverage
+    except Exception as e:
+        logger.error(f"Error validating R/R: {e}")
+        return {
+            'valid': False,
+            'error': str(e),
+            'ratio': 0
+        }
+
+
+def calculate_max_leverage(
+    balance: float,
+    position_value: float,
+    risk_percent: float = None
+) -> int:
+    """
+    Calculate maximum safe leverage
+    
+    Args:
+        balance: Account balance
+        position_value: Desired position value
+        risk_percent: Risk percentage
+    
+    Returns:
+        Maximum safe leverage (as integer)
+    """
+    if risk_percent is None:
+        risk_percent = RiskManager.DEFAULT_RISK_PERCENT
+    
+    # Allow any leverage - no position size limit
+    # Users can choose their own risk level
+    
+    # Cap at exchange limits only
+    max_leverage = 125  # Hyperliquid/Bybit maximum
+    
+    return max_leverage
+
+
+def validate_trade(
+    balance: float,
+    entry_price: float,
+    stop_loss: float,
+    take_profit: float,
+    leverage: int,
+    risk_percent: float = None,
+    side: str = 'buy'
+) -> Dict:
+    """
+    Complete trade validation
+    
+    Args:
+        balance: Account balance
+        entry_price: Entry price
+        stop_loss: Stop loss price
+        take_profit: Take profit price
+        leverage: Leverage
+        risk_percent: Risk percentage
+        side: Trade side
+    
+    Returns:
+        Dict with validation results and position sizing
+    """
+    try:
+        # Validate R/R ratio
+        rr_check = validate_risk_reward(
+            entry_price, stop_loss, take_profit, side
+        )
         
-        Args:
-            balance: Account balance
-            position_value: Desired position value
-            risk_percent: Risk percentage
+        # Calculate position size
+        position = calculate_position_size(
+            balance, entry_price, stop_loss, risk_percent, leverage, side
+        )
         
-        Returns:
-            Maximum safe leverage (as integer)
-        """
-        if risk_percent is None:
-            risk_percent = RiskManager.DEFAULT_RISK_PERCENT
+        # Overall validation
+        is_valid = rr_check['valid'] and position['success']
+        
+        warnings = []
+        if not rr_check['valid']:
+            warnings.append(f"Low R/R ratio: {rr_check['ratio']:.2f}")
         
-        # Allow any leverage - no position size limit
-        # Users can choose their own risk level
+        if position.get('position_percent', 0) > 30:
+            warnings.append(f"Large position: {position['position_percent']:.1f}% of balance")
         
-        # Cap at exchange limits only
-        max_leverage = 125  # Hyperliquid/Bybit maximum
+        if leverage > 10:
+            warnings.append(f"High leverage: {leverage}x")
         
-        return max_leverage
+        return {
+            'valid': is_valid,
+            'position_size': position.get('position_size', 0),
+            'position_details': position,
+            'risk_reward': rr_check,
+            'warnings': warnings,
+            'recommendation': 'EXECUTE' if is_valid and not warnings else 'REVIEW'
+        }
     
-    @staticmethod
-    def validate_trade(
-        balance: float,
-        entry_price: float,
-        stop_loss: float,
-        take_profit: float,
-        leverage: int,
-        risk_percent: float = None,
-        side: str = 'buy'
-    ) -> Dict:
-        """
-        Complete trade validation
+    except Exception as e:
+        logger.error(f"Trade validation error: {e}")
+        return {
+            'valid': False,
+            'error': str(e),
+            'position_size': 0
+        }
+
+
+def validate_trades_batch(
+    balances: Sequence[float],
+    entries: Sequence[float],
+    stops: Sequence[float],
+    take_profits: Sequence[Union[float, List[float]]],
+    leverages: Sequence[int],
+    risk_percents: Optional[Sequence[Optional[float]]] = None
+) -> Dict[str, List]:
+    """
+    Validate many trades at once (signal bursts, replays)
+    
+    Uses the same sizing and R/R formulas as validate_trade, without per-trade
+    logging or result dicts. Invalid inputs get a size/ratio of 0 and valid=False.
+    
+    Args:
+        balances: Account balance per trade
+        entries: Entry price per trade
+        stops: Stop loss price per trade
+        take_profits: Take profit price per trade (single or list, first TP is used)
+        leverages: Leverage per trade
+        risk_percents: Risk percentage per trade (None entries = default)
+    
+    Returns:
+        Dict of parallel lists: position_size, position_value, risk_reward, valid
+    
+    Raises:
+        ValueError: If the input sequences differ in length
+    """
+    default_risk = RiskManager.DEFAULT_RISK_PERCENT
+    max_risk = RiskManager.MAX_RISK_PERCENT
+    min_rr = RiskManager.MIN_RISK_REWARD_RATIO
+    
+    count = len(balances)
+    if risk_percents is None:
+        risk_percents = [None] * count
+    
+    # zip would silently drop the trades past the shortest sequence
+    if any(len(seq) != count for seq in (entries, stops, take_profits, leverages, risk_percents)):
+        raise ValueError("validate_trades_batch: all input sequences must have the same length")
+    
+    sizes = []
+    values = []
+    ratios = []
+    valid = []
+    
+    for balance, entry, stop, tp, leverage, risk_percent in zip(
+        balances, entries, stops, take_profits, leverages, risk_percents
+    ):
+        distance = abs(entry - stop)
+        if balance <= 0 or entry <= 0 or stop <= 0 or distance == 0:
+            sizes.append(0)
+            values.append(0)
+            ratios.append(0)
+            valid.append(False)
+            continue
+        
+        if risk_percent is None:
+            risk_percent = default_risk
+        elif risk_percent > max_risk:
+            risk_percent = max_risk
         
-        Args:
-            balance: Account balance
-            entry_price: Entry price
-            stop_loss: Stop loss price
-            take_profit: Take profit price
-            leverage: Leverage
-            risk_percent: Risk percentage
-            side: Trade side
+        # position value = risk amount / (distance / entry), then leveraged
+        position_value = balance * risk_percent / 100 * entry / distance * leverage
         
-        Returns:
-            Dict with validation results and position sizing
-        """
-        try:
-            # Validate R/R ratio
-            rr_check = RiskManager.validate_risk_reward(
-                entry_price, stop_loss, take_profit, side
-            )
-            
-            # Calculate position size
-            position = RiskManager.calculate_position_size(
-                balance, entry_price, stop_loss, risk_percent, leverage, side
-            )
-            
-            # Overall validation
-            is_valid = rr_check['valid'] and position['success']
-            
-            warnings = []
-            if not rr_check['valid']:
-                warnings.append(f"Low R/R ratio: {rr_check['ratio']:.2f}")
-            
-            if position.get('position_percent', 0) > 30:
-                warnings.append(f"Large position: {position['position_percent']:.1f}% of balance")
-            
-            if leverage > 10:
-                warnings.append(f"High leverage: {leverage}x")
-            
-            return {
-                'valid': is_valid,
-                'position_size': position.get('position_size', 0),
-                'position_details': position,
-                'risk_reward': rr_check,
-                'warnings': warnings,
-                'recommendation': 'EXECUTE' if is_valid and not warnings else 'REVIEW'
-            }
-            
-        except Exception as e:
-            logger.error(f"Trade validation error: {e}")
-            return {
-                'valid': False,
-                'error': str(e),
-                'position_size': 0
-            }
+        # Multiple TPs: use the first one, as validate_risk_reward does
+        if isinstance(tp, list):
+            tp = tp[0] if tp else entry
+        rr_ratio = abs(tp - entry) / distance
+        
+        sizes.append(round(position_value / entry, 6))
+        values.append(round(position_value, 2))
+        ratios.append(round(rr_ratio, 2))
+        valid.append(rr_ratio >= min_rr)
+    
+    return {
+        'position_size': sizes,
+        'position_value': values,
+        'risk_reward': ratios,
+        'valid': valid
+    }
+
+
+class RiskManager:
+    """
+    Manages risk and position sizing for trades
+    
+    Features:
+    - Dynamic position sizing based on account balance
+    - Risk-based calculations (% of account per trade)
+    - Stop-loss distance validation
+    - Leverage adjustment
+    - Maximum position limits
+    """
+    
+    # Default risk parameters
+    DEFAULT_RISK_PERCENT = 2.0  # Risk 2% of account per trade
+    MAX_RISK_PERCENT = 5.0  # Maximum 5% risk allowed
+    MIN_RISK_REWARD_RATIO = 1.5  # Minimum 1.5:1 R/R ratio
+    MAX_POSITION_PERCENT = 50.0  # Max 50% of account in single position
+    
+    # Backwards-compatible namespace for the module-level functions
+    calculate_position_size = staticmethod(calculate_position_size)
+    validate_risk_reward = staticmethod(validate_risk_reward)
+    calculate_max_leverage = staticmethod(calculate_max_leverage)
+    validate_trade = staticmethod(validate_trade)
+    validate_trades_batch = staticmethod(validate_trades_batch)
@@ -3,12 +3,161 @@ Trade Analytics Module
 Tracks and analyzes trading performance
 """
 import logging
-from typing import Dict, List, Optional, Union
-from datetime import datetime, timedelta
-from collections import defaultdict
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
+from collections import OrderedDict
+from functools import cached_property
+from itertools import accumulate
+from operator import sub
 
 logger = logging.getLogger(__name__)
 
+# Per-trade P&L as used by the analytics: the stored pnl, or (when it is exactly 0)
+# derived from entry/exit prices. Mirrors the fallback in _get_closed_trades.
+_PNL_SQL = """
+    CASE
+        WHEN pnl = 0 AND entry_price <> 0 AND exit_price <> 0 THEN
+            CASE WHEN side = 'long'
+                THEN (exit_price::float8 - entry_price::float8) * COALESCE(position_size, 0)::float8
+                ELSE (entry_price::float8 - exit_price::float8) * COALESCE(position_size, 0)::float8
+            END
+        ELSE COALESCE(pnl, 0)::float8
+    END
+"""
+
+# Columns selected by _get_closed_trades, in order
+_TRADE_COLUMNS = (
+    'id', 'user_id', 'exchange', 'symbol', 'side',
+    'position_size', 'entry_price', 'exit_price',
+    'pnl', 'status', 'created_at', 'closed_at'
+)
+
+# Fields of the per-trade dicts returned by _get_closed_trades
+_TRADE_FIELDS = tuple(c for c in _TRADE_COLUMNS if c != 'status')
+
+# Rows pulled per round trip from server-side cursors
+_STREAM_ITERSIZE = 10_000
+
+# Trade count above which drawdown uses compensated prefix sums
+_COMPENSATED_SUM_THRESHOLD = 10_000
+
+# Memoization of metric queries (shared by all TradeAnalytics instances)
+_CACHE_TTL_SECONDS = 60
+_CACHE_MAXSIZE = 512
+
+def _compensated_cumsum(values: List[float]) -> List[float]:
+    """Running totals of values using Neumaier (improved Kahan) compensation"""
+    totals = []
+    total = 0.0
+    compensation = 0.0
+    for value in values:
+        t = total + value
+        if abs(total) >= abs(value):
+            compensation += (total - t) + value
+        else:
+            compensation += (value - t) + total
+        total = t
+        totals.append(total + compensation)
+    return totals
+
+
+# Performance report body; the rating line is appended after the last heading
+_REPORT_TEMPLATE = """📊 **PERFORMANCE REPORT** ({days} days)
+
+**📈 Overview:**
+• Total Trades: {total_trades}
+• Wins: {winning_trades} | Losses: {losing_trades}
+• Win Rate: **{win_rate:.1f}%**
+• Profit Factor: **{profit_factor:.2f}**
+
+**💰 Profit & Loss:**
+• Total Profit: ${total_profit:.2f}
+• Total Loss: -${total_loss:.2f}
+• **Net P&L: ${net_pnl:.2f}**
+• Expectancy: ${expectancy:.2f} per trade
+
+**📊 Average Performance:**
+• Avg Win: ${avg_win:.2f}
+• Avg Loss: -${avg_loss:.2f}
+• Avg Trade: ${avg_pnl:.2f}
+
+**🎯 Best & Worst:**
+• Largest Win: ${largest_win:.2f}
+• Largest Loss: ${largest_loss:.2f}
+
+**📉 Risk Metrics:**
+• Max Drawdown: -${max_drawdown:.2f} ({max_drawdown_percent:.1f}%)
+• Max Consecutive Wins: {max_consecutive_wins}
+• Max Consecutive Losses: {max_consecutive_losses}
+• Current Streak: {current_streak}
+
+**💡 Performance Rating:**
+"""
+
+# (min profit factor, min win rate %, label), best rating first
+_RATING_TABLE = (
+    (2.0, 60, "⭐⭐⭐⭐⭐ EXCELLENT"),
+    (1.5, 50, "⭐⭐⭐⭐ VERY GOOD"),
+    (1.0, 45, "⭐⭐⭐ GOOD"),
+)
+
+
+def _performance_rating(metrics: Dict) -> str:
+    """Pick the report rating label for a metrics dict"""
+    profit_factor = metrics['profit_factor']
+    win_rate = metrics['win_rate']
+    for min_profit_factor, min_win_rate, label in _RATING_TABLE:
+        if profit_factor >= min_profit_factor and win_rate >= min_win_rate:
+            return label
+    return "⭐⭐ PROFITABLE" if metrics['net_pnl'] > 0 else "⭐ NEEDS IMPROVEMENT"
+
+
+def _format_report(metrics: Dict, days: int) -> str:
+    """Render a metrics dict as the text performance report"""
+    if metrics.get('total_trades', 0) == 0:
+        return "📊 **Performance Report**\n\nNo completed trades in this period."
+    
+    # Flatten the nested risk dicts so the template can address them directly
+    fields = {
+        **metrics,
+        **metrics['max_drawdown'],
+        **metrics['consecutive_stats'],
+        'days': days
+    }
+    
+    return _REPORT_TEMPLATE.format_map(fields) + _performance_rating(metrics)
+
+
+def _aggregate_pnls(pnls: List[float]) -> Dict:
+    """Python counterpart of _get_aggregate_metrics over an in-memory P&L list"""
+    win_count = loss_count = 0
+    total_profit = loss_sum = 0.0
+    largest_win = largest_loss = 0
+    for pnl in pnls:
+        if pnl > 0:
+            win_count += 1
+            total_profit += pnl
+            if pnl > largest_win:
+                largest_win = pnl
+        elif pnl < 0:
+            loss_count += 1
+            loss_sum += pnl
+            if pnl < largest_loss:
+                largest_loss = pnl
+    
+    return {
+        'total_trades': len(pnls),
+        'winning_trades': win_count,
+        'losing_trades': loss_count,
+        'gross_profit': total_profit,
+        'gross_loss': loss_sum,
+        'largest_win': largest_win,
+        'largest_loss': largest_loss
+    }
+
+
 class TradeAnalytics:
     """
     Comprehensive trade analytics and performance tracking
@@ -31,6 +180,59 @@ class TradeAnalytics:
         """
         self.db = db_manager
     
+    # Callers build a fresh TradeAnalytics per request, so the cache lives on the class.
+    # Entries are (expires_at, result), kept in LRU order.
+    _cache: 'OrderedDict[tuple, Tuple[float, Dict]]' = OrderedDict()
+    _cache_lock = threading.Lock()
+    
+    @classmethod
+    def invalidate_cache(cls):
+        """Drop all memoized results (call when a trade is closed)"""
+        with cls._cache_lock:
+            cls._cache.clear()
+    
+    def _cached(self, key: tuple, compute) -> Dict:
+        """Return a memoized result for key, computing and storing it on a miss or expiry"""
+        key = (id(self.db),) + key
+        now = time.monotonic()
+        cache = TradeAnalytics._cache
+        
+        with self._cache_lock:
+            entry = cache.get(key)
+            if entry is not None and entry[0] > now:
+                cache.move_to_end(key)
+                return entry[1]
+        
+        result = compute()
+        
+        # Don't serve a failure (e.g. a DB outage) for the whole TTL - the
+        # _compute_* methods report one as an {'error': ...} result
+        if 'error' not in result:
+            with self._cache_lock:
+                cache[key] = (now + _CACHE_TTL_SECONDS, result)
+                cache.move_to_end(key)
+                while len(cache) > _CACHE_MAXSIZE:
+                    cache.popitem(last=False)
+        
+        return result
+    
+    def snapshot(self, user_id: Optional[int] = None, days: int = 30) -> 'MetricsSnapshot':
+        """
+        Fetch closed trades once and derive every view from that single fetch
+        
+        Use this when several views are needed together (e.g. a report plus the
+        symbol breakdown); each view is computed lazily and then memoized.
+        
+        Args:
+            user_id: Filter by user ID (None = all users)
+            days: Number of days to analyze
+        
+        Returns:
+            MetricsSnapshot with .metrics, .by_symbol, .daily_pnl and .report
+        """
+        columns = self._get_closed_trades_columnar(user_id, days, None, None)
+        return MetricsSnapshot(self, user_id, days, columns)
+    
     def calculate_metrics(
         self,
         user_id: Optional[int] = None,
@@ -41,6 +243,8 @@ class TradeAnalytics:
         """
         Calculate comprehensive trading metrics
         
+        Results are memoized for a short TTL; treat the returned dict as read-only.
+        
         Args:
             user_id: Filter by user ID (None = all users)
             days: Number of days to analyze
@@ -50,203 +254,347 @@ class TradeAnalytics:
         Returns:
             Dict with all metrics
         """
+        return self._cached(
+            ('metrics', user_id, days, symbol, exchange),
+            lambda: self._compute_metrics(user_id, days, symbol, exchange)
+        )
+    
+    def _compute_metrics(
+        self,
+        user_id: Optional[int],
+        days: int,
+        symbol: Optional[str],
+        exchange: Optional[str]
+    ) -> Dict:
+        """Uncached implementation of calculate_metrics"""
+        # Any failing query fails the whole call: aggregates merged with a
+        # silently empty P&L series would report zero drawdown and streaks
         try:
-            trades = self._get_closed_trades(user_id, days, symbol, exchange)
+            # Counts, sums and extremes are aggregated by PostgreSQL
+            aggregates = self._get_aggregate_metrics(user_id, days, symbol, exchange)
+            if not aggregates['total_trades']:
+                return self._build_metrics(aggregates, [], {}, days, user_id, symbol, exchange)
             
-            if not trades:
-                return {
-                    'total_trades': 0,
-                    'message': 'No completed trades in this period'
-                }
+            # Drawdown and streaks depend on trade order - fetch the ordered P&L only
+            pnls = self._get_pnl_series(user_id, days, symbol, exchange)
+            
+            # Performance by period
+            daily_pnl = self._get_daily_pnl_sql(user_id, days, symbol, exchange)
             
-            # Separate wins and losses
-            wins = [t for t in trades if t['pnl'] > 0]
-            losses = [t for t in trades if t['pnl'] < 0]
-            breakeven = [t for t in trades if t['pnl'] == 0]
+            return self._build_metrics(aggregates, pnls, daily_pnl, days, user_id, symbol, exchange)
             
-            # Calculate basic metrics
-            total_profit = sum(t['pnl'] for t in wins)
-            total_loss = abs(sum(t['pnl'] for t in losses))
-            net_pnl = total_profit - total_loss
+        except Exception as e:
+            logger.error(f"Error calculating metrics: {e}")
+            return {
+                'error': str(e),
+                'total_trades': 0
+            }
+    
+    def _build_metrics(
+        self,
+        aggregates: Dict,
+        pnls: List[float],
+        daily_pnl: Dict,
+        days: int,
+        user_id: Optional[int],
+        symbol: Optional[str],
+        exchange: Optional[str]
+    ) -> Dict:
+        """Derive the full metrics dict from aggregates and the ordered P&L"""
+        total_trades = aggregates['total_trades']
+        
+        if not total_trades:
+            return {
+                'total_trades': 0,
+                'message': 'No completed trades in this period'
+            }
+        
+        win_count = aggregates['winning_trades']
+        loss_count = aggregates['losing_trades']
+        breakeven_count = total_trades - win_count - loss_count
+        total_profit = aggregates['gross_profit']
+        loss_sum = aggregates['gross_loss']
+        largest_win = aggregates['largest_win']
+        largest_loss = aggregates['largest_loss']
+        
+        # Calculate basic metrics
+        total_loss = abs(loss_sum)
+        net_pnl = total_profit - total_loss
+        
+        # Win rate
+        win_rate = (win_count / total_trades) * 100
+        
+        # Profit factor (total profit / total loss)
+        profit_factor = total_profit / total_loss if total_loss > 0 else float('inf')
+        
+        # Average metrics
+        avg_win = total_profit / win_count if win_count else 0
+        avg_loss = total_loss / loss_count if loss_count else 0
+        avg_pnl = net_pnl / total_trades
+        
+        # Expectancy (average expected return per trade)
+        expectancy = (win_rate / 100 * avg_win) - ((100 - win_rate) / 100 * avg_loss)
+        
+        # Calculate drawdown
+        drawdown_info = self._calculate_drawdown(pnls)
+        
+        # Calculate consecutive stats
+        consecutive_stats = self._calculate_consecutive_stats(pnls)
+        
+        # Removed verbose logging for production
+        
+        return {
+            'period_days': days,
+            'total_trades': total_trades,
+            'winning_trades': win_count,
+            'losing_trades': loss_count,
+            'breakeven_trades': breakeven_count,
             
-            # Win rate
-            win_rate = (len(wins) / len(trades)) * 100 if trades else 0
+            # Performance metrics
+            'win_rate': round(win_rate, 2),
+            'profit_factor': round(profit_factor, 2),
+            'expectancy': round(expectancy, 2),
             
-            # Profit factor (total profit / total loss)
-            profit_factor = total_profit / total_loss if total_loss > 0 else float('inf')
+            # P&L metrics
+            'total_profit': round(total_profit, 2),
+            'total_loss': round(total_loss, 2),
+            'net_pnl': round(net_pnl, 2),
             
             # Average metrics
-            avg_win = total_profit / len(wins) if wins else 0
-            avg_loss = total_loss / len(losses) if losses else 0
-            avg_pnl = net_pnl / len(trades) if trades else 0
+            'avg_win': round(avg_win, 2),
+            'avg_loss': round(avg_loss, 2),
+            'avg_pnl': round(avg_pnl, 2),
             
-            # Best and worst trades
-            largest_win = max((t['pnl'] for t in wins), default=0)
-            largest_loss = min((t['pnl'] for t in losses), default=0)
+            # Best/Worst
+            'largest_win': round(largest_win, 2),
+            'largest_loss': round(largest_loss, 2),
             
-            # Expectancy (average expected return per trade)
-            expectancy = (win_rate / 100 * avg_win) - ((100 - win_rate) / 100 * avg_loss)
+            # Risk metrics
+            'max_drawdown': drawdown_info,
+            'consecutive_stats': consecutive_stats,
             
-            # Calculate drawdown
-            drawdown_info = self._calculate_drawdown(trades)
+            # Time-based
+            'daily_pnl': daily_pnl,
             
-            # Calculate consecutive stats
-            consecutive_stats = self._calculate_consecutive_stats(trades)
+            # Filters applied
+            'filtered_by': {
+                'user_id': user_id,
+                'symbol': symbol,
+                'exchange': exchange
+            }
+        }
+    
+    @staticmethod
+    def _build_trade_filter(
+        user_id: Optional[int],
+        days: int,
+        symbol: Optional[str],
+        exchange: Optional[str]
+    ) -> Tuple[str, List]:
+        """Build the WHERE clause (and params) selecting closed trades for the filters"""
+        where = """
+                    WHERE status IN ('closed', 'completed')
+                    AND closed_at >= CURRENT_TIMESTAMP - make_interval(days => %s)
+        """
+        params = [int(days)]
+        
+        if user_id:
+            where += " AND user_id = %s"
+            params.append(str(user_id))
+        
+        if symbol:
+            where += " AND symbol = %s"
+            params.append(symbol)
+        
+        if exchange:
+            where += " AND exchange = %s"
+            params.append(exchange)
+        
+        return where, params
+    
+    def _get_aggregate_metrics(
+        self,
+        user_id: Optional[int],
+        days: int,
+        symbol: Optional[str],
+        exchange: Optional[str]
+    ) -> Dict:
+        """
+        Aggregate trade counts, gross profit/loss and extremes in a single query
+        
+        Database errors propagate, so calculate_metrics fails as a whole
+        instead of reporting an empty period.
+        """
+        empty = {
+            'total_trades': 0,
+            'winning_trades': 0,
+            'losing_trades': 0,
+            'gross_profit': 0,
+            'gross_loss': 0,
+            'largest_win': 0,
+            'largest_loss': 0
+        }
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
             
-            # Performance by period
-            daily_pnl = self._calculate_daily_pnl(trades)
+            where, params = self._build_trade_filter(user_id, days, symbol, exchange)
+            query = f"""
+                SELECT
+                    COUNT(*),
+                    COUNT(*) FILTER (WHERE pnl > 0),
+                    COUNT(*) FILTER (WHERE pnl < 0),
+                    COALESCE(SUM(pnl) FILTER (WHERE pnl > 0), 0),
+                    COALESCE(SUM(pnl) FILTER (WHERE pnl < 0), 0),
+                    COALESCE(MAX(pnl) FILTER (WHERE pnl > 0), 0),
+                    COALESCE(MIN(pnl) FILTER (WHERE pnl < 0), 0)
+                FROM (SELECT {_PNL_SQL} AS pnl FROM trades {where}) closed_trades
+            """
             
-            # Removed verbose logging for production
+            cursor.execute(query, params)
+            row = cursor.fetchone()
+            if not row:
+                return empty
             
-            return {
-                'period_days': days,
-                'total_trades': len(trades),
-                'winning_trades': len(wins),
-                'losing_trades': len(losses),
-                'breakeven_trades': len(breakeven),
-                
-                # Performance metrics
-                'win_rate': round(win_rate, 2),
-                'profit_factor': round(profit_factor, 2),
-                'expectancy': round(expectancy, 2),
-                
-                # P&L metrics
-                'total_profit': round(total_profit, 2),
-                'total_loss': round(total_loss, 2),
-                'net_pnl': round(net_pnl, 2),
-                
-                # Average metrics
-                'avg_win': round(avg_win, 2),
-                'avg_loss': round(avg_loss, 2),
-                'avg_pnl': round(avg_pnl, 2),
-                
-                # Best/Worst
-                'largest_win': round(largest_win, 2),
-                'largest_loss': round(largest_loss, 2),
-                
-                # Risk metrics
-                'max_drawdown': drawdown_info,
-                'consecutive_stats': consecutive_stats,
-                
-                # Time-based
-                'daily_pnl': daily_pnl,
-                
-                # Filters applied
-                'filtered_by': {
-                    'user_id': user_id,
-                    'symbol': symbol,
-                    'exchange': exchange
-                }
-            }
+            return dict(zip(empty.keys(), row))
+    
+    def _get_pnl_series(
+        self,
+        user_id: Optional[int],
+        days: int,
+        symbol: Optional[str],
+        exchange: Optional[str]
+    ) -> List[float]:
+        """Fetch only the per-trade P&L, ordered by close time (database errors propagate)"""
+        with self.db.get_connection() as conn:
+            cursor = self._stream_cursor(conn, 'trade_pnls')
             
-        except Exception as e:
-            logger.error(f"Error calculating metrics: {e}")
-            return {
-                'error': str(e),
-                'total_trades': 0
-            }
+            where, params = self._build_trade_filter(user_id, days, symbol, exchange)
+            cursor.execute(
+                f"SELECT {_PNL_SQL} FROM trades {where} ORDER BY closed_at ASC",
+                params
+            )
+            return [row[0] for row in cursor]
     
-    def _get_closed_trades(
+    def _get_daily_pnl_sql(
         self,
         user_id: Optional[int],
         days: int,
         symbol: Optional[str],
         exchange: Optional[str]
-    ) -> List[Dict]:
-        """Fetch closed trades from database"""
+    ) -> Dict:
+        """Calculate P&L by day, bucketed by PostgreSQL (database errors propagate)"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            where, params = self._build_trade_filter(user_id, days, symbol, exchange)
+            cursor.execute(
+                f"""
+                SELECT date_trunc('day', closed_at)::date, SUM({_PNL_SQL})
+                FROM trades {where}
+                GROUP BY 1
+                ORDER BY 1
+                """,
+                params
+            )
+            return {str(day): pnl for day, pnl in cursor.fetchall()}
+    
+    def _stream_cursor(self, conn, purpose: str):
+        """Open a named (server-side) cursor so rows are streamed in batches"""
+        cursor = conn.cursor(name=f'{purpose}_{os.getpid()}_{id(self)}')
+        cursor.itersize = _STREAM_ITERSIZE
+        return cursor
+    
+    def _get_closed_trades_columnar(
+        self,
+        user_id: Optional[int],
+        days: int,
+        symbol: Optional[str],
+        exchange: Optional[str]
+    ) -> Dict[str, List]:
+        """
+        Fetch closed trades as one list per column
+        
+        Returns:
+            Dict mapping each name in _TRADE_COLUMNS to a list of values, in close
+            order. 'pnl' is filled in from entry/exit prices where it is missing.
+        """
         try:
             # Use DatabaseManager's connection management
             with self.db.get_connection() as conn:
-                cursor = conn.cursor()
+                cursor = self._stream_cursor(conn, 'trades')
                 
                 # Build query with filters (PostgreSQL syntax)
-                query = """
-                    SELECT 
-                        id, user_id, exchange, symbol, side,
-                        position_size, entry_price, exit_price,
-                        pnl, status, created_at, closed_at
+                where, params = self._build_trade_filter(user_id, days, symbol, exchange)
+                query = f"""
+                    SELECT {', '.join(_TRADE_COLUMNS)}
                     FROM trades
-                    WHERE (status = 'closed' OR status = 'completed')
-                    AND closed_at >= CURRENT_TIMESTAMP - INTERVAL '%s days'
+                    {where}
+                    ORDER BY closed_at ASC
                 """
-                params = [days]
-                
-                if user_id:
-                    query += " AND user_id = %s"
-                    params.append(str(user_id))
-                
-                if symbol:
-                    query += " AND symbol = %s"
-                    params.append(symbol)
-                
-                if exchange:
-                    query += " AND exchange = %s"
-                    params.append(exchange)
-                
-                query += " ORDER BY closed_at ASC"
                 
                 cursor.execute(query, params)
-                rows = cursor.fetchall()
-                
-                trades = []
-                for row in rows:
-                    # Handle dictionary-like row access
-                    if isinstance(row, dict):
-                        row_dict = row
-                    else:
-                        # Convert tuple to dict using column names
-                        columns = [desc[0] for desc in cursor.description]
-                        row_dict = dict(zip(columns, row))
-                    
-                    # Calculate PNL if it's missing or zero
-                    pnl = row_dict.get('pnl', 0)
-                    if pnl == 0 and row_dict.get('entry_price') and row_dict.get('exit_price'):
-                        entry = float(row_dict['entry_price'])
-                        exit_price = float(row_dict['exit_price'])
-                        position_size = float(row_dict.get('position_size', 0) or 0)
-                        
-                        if row_dict['side'] == 'long':
-                            pnl = (exit_price - entry) * position_size
-                        else:  # short
-                            pnl = (entry - exit_price) * position_size
-                    
-                    trades.append({
-                        'id': row_dict['id'],
-                        'user_id': row_dict['user_id'],
-                        'exchange': row_dict['exchange'],
-                        'symbol': row_dict['symbol'],
-                        'side': row_dict['side'],
-                        'position_size': row_dict.get('position_size', 0),
-                        'entry_price': row_dict.get('entry_price'),
-                        'exit_price': row_dict.get('exit_price'),
-                        'pnl': pnl or 0,
-                        'created_at': row_dict.get('created_at'),
-                        'closed_at': row_dict.get('closed_at')
-                    })
-                
-                return trades
+                rows = [
+                    tuple(row[c] for c in _TRADE_COLUMNS) if isinstance(row, dict) else row
+                    for row in cursor
+                ]
         except Exception as e:
             logger.error(f"Error fetching trades: {e}")
-            return []
+            rows = []
+        
+        if not rows:
+            return {c: [] for c in _TRADE_COLUMNS}
+        
+        # Transpose rows into columns in one C-level pass
+        columns = dict(zip(_TRADE_COLUMNS, map(list, zip(*rows))))
+        
+        # Calculate PNL if it's missing or zero
+        columns['pnl'] = [
+            (
+                (float(exit_price) - float(entry)) if side == 'long'
+                else (float(entry) - float(exit_price))  # short
+            ) * float(size or 0)
+            if pnl == 0 and entry and exit_price else (pnl or 0)
+            for pnl, entry, exit_price, size, side in zip(
+                columns['pnl'],
+                columns['entry_price'],
+                columns['exit_price'],
+                columns['position_size'],
+                columns['side']
+            )
+        ]
+        
+        return columns
+    
+    def _get_closed_trades(
+        self,
+        user_id: Optional[int],
+        days: int,
+        symbol: Optional[str],
+        exchange: Optional[str]
+    ) -> List[Dict]:
+        """Fetch closed trades from database, one dict per trade"""
+        columns = self._get_closed_trades_columnar(user_id, days, symbol, exchange)
+        return [
+            dict(zip(_TRADE_FIELDS, values))
+            for values in zip(*(columns[field] for field in _TRADE_FIELDS))
+        ]
     
-    def _calculate_drawdown(self, trades: List[Dict]) -> Dict:
-        """Calculate maximum drawdown"""
-        if not trades:
+    def _calculate_drawdown(self, pnls: List[float]) -> Dict:
+        """Calculate maximum drawdown from chronologically ordered trade P&L"""
+        if not pnls:
             return {'max_drawdown': 0, 'max_drawdown_percent': 0}
         
-        # Calculate cumulative P&L
-        cumulative_pnl = 0
-        peak = 0
-        max_drawdown = 0
+        # Cumulative P&L and running peak (starting from 0), computed in C by accumulate.
+        # Long histories use compensated summation so rounding error doesn't build up.
+        if len(pnls) > _COMPENSATED_SUM_THRESHOLD:
+            cumulative = _compensated_cumsum(pnls)
+        else:
+            cumulative = list(accumulate(pnls))
+        peaks = accumulate(cumulative, max, initial=0)
+        next(peaks)  # drop the initial 0 so peaks line up with cumulative
         
-        for trade in trades:
-            cumulative_pnl += trade['pnl']
-            if cumulative_pnl > peak:
-                peak = cumulative_pnl
-            
-            drawdown = peak - cumulative_pnl
-            if drawdown > max_drawdown:
-                max_drawdown = drawdown
+        max_drawdown = max(map(sub, peaks, cumulative))
+        peak = max(0, max(cumulative))
         
         max_drawdown_percent = (max_drawdown / peak * 100) if peak > 0 else 0
         
@@ -255,9 +603,9 @@ class TradeAnalytics:
             'max_drawdown_percent': round(max_drawdown_percent, 2)
         }
     
-    def _calculate_consecutive_stats(self, trades: List[Dict]) -> Dict:
-        """Calculate consecutive wins/losses"""
-        if not trades:
+    def _calculate_consecutive_stats(self, pnls: List[float]) -> Dict:
+        """Calculate consecutive wins/losses from chronologically ordered trade P&L"""
+        if not pnls:
             return {
                 'max_consecutive_wins': 0,
                 'max_consecutive_losses': 0,
@@ -269,12 +617,12 @@ class TradeAnalytics:
         current_wins = 0
         current_losses = 0
         
-        for trade in trades:
-            if trade['pnl'] > 0:
+        for pnl in pnls:
+            if pnl > 0:
                 current_wins += 1
                 current_losses = 0
                 max_wins = max(max_wins, current_wins)
-            elif trade['pnl'] < 0:
+            elif pnl < 0:
                 current_losses += 1
                 current_wins = 0
                 max_losses = max(max_losses, current_losses)
@@ -283,10 +631,10 @@ class TradeAnalytics:
                 current_losses = 0
         
         # Determine current streak
-        last_trade = trades[-1]
-        if last_trade['pnl'] > 0:
+        last_pnl = pnls[-1]
+        if last_pnl > 0:
             current_streak = current_wins
-        elif last_trade['pnl'] < 0:
+        elif last_pnl < 0:
             current_streak = -current_losses
         else:
             current_streak = 0
@@ -297,66 +645,76 @@ class TradeAnalytics:
             'current_streak': current_streak
         }
     
-    def _calculate_daily_pnl(self, trades: List[Dict]) -> Dict:
-        """Calculate P&L by day"""
-        daily_pnl = defaultdict(float)
-        
-        for trade in trades:
-            try:
-                date = datetime.fromisoformat(trade['closed_at']).date()
-                daily_pnl[str(date)] += trade['pnl']
-            except:
-                pass
-        
-        return dict(daily_pnl)
-    
     def get_performance_by_symbol(
         self,
         user_id: Optional[int] = None,
-        days: int = 30
+        days: int = 30,
+        top_k: Optional[int] = 20
+    ) -> Dict[str, Dict]:
+        """
+        Get performance breakdown by symbol (memoized like calculate_metrics)
+        
+        Args:
+            user_id: Filter by user ID (None = all users)
+            days: Number of days to analyze
+            top_k: Only return the best N symbols by total P&L (None = all)
+        
+        Returns:
+            Dict of symbol -> stats, best total P&L first, or {'error': ...}
+            if the query failed (not memoized)
+        """
+        return self._cached(
+            ('by_symbol', user_id, days, top_k),
+            lambda: self._compute_performance_by_symbol(user_id, days, top_k)
+        )
+    
+    def _compute_performance_by_symbol(
+        self,
+        user_id: Optional[int],
+        days: int,
+        top_k: Optional[int]
     ) -> Dict[str, Dict]:
-        """Get performance breakdown by symbol"""
+        """Uncached implementation of get_performance_by_symbol"""
         try:
-            trades = self._get_closed_trades(user_id, days, None, None)
-            
-            if not trades:
-                return {}
-            
-            # Group by symbol
-            by_symbol = defaultdict(list)
-            for trade in trades:
-                by_symbol[trade['symbol']].append(trade)
-            
-            # Calculate metrics for each symbol
-            results = {}
-            for symbol, symbol_trades in by_symbol.items():
-                wins = [t for t in symbol_trades if t['pnl'] > 0]
-                losses = [t for t in symbol_trades if t['pnl'] < 0]
+            with self.db.get_connection() as conn:
+                cursor = conn.cursor()
                 
-                total_pnl = sum(t['pnl'] for t in symbol_trades)
-                win_rate = len(wins) / len(symbol_trades) * 100 if symbol_trades else 0
+                # Group by symbol in PostgreSQL, best total P&L first
+                where, params = self._build_trade_filter(user_id, days, None, None)
+                query = f"""
+                    SELECT
+                        symbol,
+                        COUNT(*),
+                        COUNT(*) FILTER (WHERE pnl > 0),
+                        COUNT(*) FILTER (WHERE pnl < 0),
+                        SUM(pnl)
+                    FROM (
+                        SELECT symbol, closed_at, {_PNL_SQL} AS pnl FROM trades {where}
+                    ) closed_trades
+                    GROUP BY symbol
+                    ORDER BY ROUND(SUM(pnl)::numeric, 2) DESC, MIN(closed_at) ASC
+                    LIMIT %s
+                """
                 
-                results[symbol] = {
-                    'total_trades': len(symbol_trades),
-                    'wins': len(wins),
-                    'losses': len(losses),
-                    'win_rate': round(win_rate, 2),
+                # LIMIT NULL returns every row
+                cursor.execute(query, params + [top_k])
+                rows = cursor.fetchall()
+            
+            return {
+                symbol: {
+                    'total_trades': total,
+                    'wins': wins,
+                    'losses': losses,
+                    'win_rate': round(wins / total * 100, 2),
                     'total_pnl': round(total_pnl, 2),
-                    'avg_pnl': round(total_pnl / len(symbol_trades), 2)
+                    'avg_pnl': round(total_pnl / total, 2)
                 }
-            
-            # Sort by total P&L
-            results = dict(sorted(
-                results.items(),
-                key=lambda x: x[1]['total_pnl'],
-                reverse=True
-            ))
-            
-            return results
+                for symbol, total, wins, losses, total_pnl in rows
+            }
             
         except Exception as e:
             logger.error(f"Error calculating symbol performance: {e}")
-            return {}
+            return {'error': str(e)}
     
     def create_performance_report(
         self,
@@ -369,54 +727,84 @@ class TradeAnalytics:
         Returns:
             Formatted text report
         """
-        metrics = self.calculate_metrics(user_id, days)
-        
-        if metrics.get('total_trades', 0) == 0:
-            return "📊 **Performance Report**\n\nNo completed trades in this period."
-        
-        report = f"""
-📊 **PERFORMANCE REPORT** ({days} days)
+        return _format_report(self.calculate_metrics(user_id, days), days)
 
-**📈 Overview:**
-• Total Trades: {metrics['total_trades']}
-• Wins: {metrics['winning_trades']} | Losses: {metrics['losing_trades']}
-• Win Rate: **{metrics['win_rate']:.1f}%**
-• Profit Factor: **{metrics['profit_factor']:.2f}**
-
-**💰 Profit & Loss:**
-• Total Profit: ${metrics['total_profit']:.2f}
-• Total Loss: -${metrics['total_loss']:.2f}
-• **Net P&L: ${metrics['net_pnl']:.2f}**
-• Expectancy: ${metrics['expectancy']:.2f} per trade
-
-**📊 Average Performance:**
-• Avg Win: ${metrics['avg_win']:.2f}
-• Avg Loss: -${metrics['avg_loss']:.2f}
-• Avg Trade: ${metrics['avg_pnl']:.2f}
-
-**🎯 Best & Worst:**
-• Largest Win: ${metrics['largest_win']:.2f}
-• Largest Loss: ${metrics['largest_loss']:.2f}
 
-**📉 Risk Metrics:**
-• Max Drawdown: -${metrics['max_drawdown']['max_drawdown']:.2f} ({metrics['max_drawdown']['max_drawdown_percent']:.1f}%)
-• Max Consecutive Wins: {metrics['consecutive_stats']['max_consecutive_wins']}
-• Max Consecutive Losses: {metrics['consecutive_stats']['max_consecutive_losses']}
-• Current Streak: {metrics['consecutive_stats']['current_streak']}
-
-**💡 Performance Rating:**
-"""
+class MetricsSnapshot:
+    """
+    Analytics views over one fetch of closed trades (see TradeAnalytics.snapshot)
+    
+    Produces the same dicts as calculate_metrics, get_performance_by_symbol
+    (all symbols) and create_performance_report for the same user and period.
+    """
+    
+    def __init__(self, analytics: TradeAnalytics, user_id: Optional[int], days: int, columns: Dict[str, List]):
+        self.analytics = analytics
+        self.user_id = user_id
+        self.days = days
+        self.columns = columns
+    
+    @cached_property
+    def metrics(self) -> Dict:
+        """Overall metrics, as returned by calculate_metrics"""
+        pnls = self.columns['pnl']
+        try:
+            return self.analytics._build_metrics(
+                _aggregate_pnls(pnls), pnls, self.daily_pnl,
+                self.days, self.user_id, None, None
+            )
+        except Exception as e:
+            logger.error(f"Error calculating metrics: {e}")
+            return {
+                'error': str(e),
+                'total_trades': 0
+            }
+    
+    @cached_property
+    def by_symbol(self) -> Dict[str, Dict]:
+        """Performance by symbol, best total P&L first"""
+        # symbol -> [trades, wins, losses, total P&L], in first-close order
+        groups = {}
+        for symbol, pnl in zip(self.columns['symbol'], self.columns['pnl']):
+            group = groups.get(symbol)
+            if group is None:
+                group = groups[symbol] = [0, 0, 0, 0.0]
+            group[0] += 1
+            if pnl > 0:
+                group[1] += 1
+            elif pnl < 0:
+                group[2] += 1
+            group[3] += pnl
         
-        # Add rating
-        if metrics['profit_factor'] >= 2.0 and metrics['win_rate'] >= 60:
-            report += "⭐⭐⭐⭐⭐ EXCELLENT"
-        elif metrics['profit_factor'] >= 1.5 and metrics['win_rate'] >= 50:
-            report += "⭐⭐⭐⭐ VERY GOOD"
-        elif metrics['profit_factor'] >= 1.0 and metrics['win_rate'] >= 45:
-            report += "⭐⭐⭐ GOOD"
-        elif metrics['net_pnl'] > 0:
-            report += "⭐⭐ PROFITABLE"
-        else:
-            report += "⭐ NEEDS IMPROVEMENT"
+        results = {
+            symbol: {
+                'total_trades': total,
+                'wins': wins,
+                'losses': losses,
+                'win_rate': round(wins / total * 100, 2),
+                'total_pnl': round(total_pnl, 2),
+                'avg_pnl': round(total_pnl / total, 2)
+            }
+            for symbol, (total, wins, losses, total_pnl) in groups.items()
+        }
         
-        return report.strip()
+        return dict(sorted(
+            results.items(),
+            key=lambda x: x[1]['total_pnl'],
+            reverse=True
+        ))
+    
+    @cached_property
+    def daily_pnl(self) -> Dict:
+        """P&L by close date"""
+        daily_pnl = {}
+        for closed_at, pnl in zip(self.columns['closed_at'], self.columns['pnl']):
+            if closed_at:
+                day = str(closed_at.date())
+                daily_pnl[day] = daily_pnl.get(day, 0) + pnl
+        return daily_pnl
+    
+    @cached_property
+    def report(self) -> str:
+        """Formatted text report, as returned by create_performance_report"""
+        return _format_report(self.metrics, self.days)
@@ -3,14 +3,24 @@ Trade Protection Module
 Handles slippage validation and rate limiting
 """
 import asyncio
+import math
+import random
+import re
 import time
 import logging
 from functools import wraps
-from typing import Callable, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
 from collections import deque
 
 logger = logging.getLogger(__name__)
 
+# Error messages that mean the exchange is throttling us
+_RATE_LIMIT_RE = re.compile(r'rate limit|too many requests|429|throttle', re.I)
+
+# Default slippage limits (module level so the hot paths skip the class attribute lookup)
+_MAX_SLIPPAGE_PERCENT = 0.5  # 0.5% maximum slippage
+_WARNING_SLIPPAGE_PERCENT = 0.3  # 0.3% warning threshold
+
 class SlippageProtection:
     """
     Protects against excessive slippage on order execution
@@ -19,8 +29,8 @@ class SlippageProtection:
     """
     
     # Default slippage limits
-    MAX_SLIPPAGE_PERCENT = 0.5  # 0.5% maximum slippage
-    WARNING_SLIPPAGE_PERCENT = 0.3  # 0.3% warning threshold
+    MAX_SLIPPAGE_PERCENT = _MAX_SLIPPAGE_PERCENT
+    WARNING_SLIPPAGE_PERCENT = _WARNING_SLIPPAGE_PERCENT
     
     @staticmethod
     def calculate_slippage(expected_price: float, actual_price: float, side: str = 'buy') -> Dict:
@@ -35,70 +45,125 @@ class SlippageProtection:
         Returns:
             Dict with slippage details
         """
-        try:
-            if expected_price <= 0 or actual_price <= 0:
-                return {
-                    'valid': False,
-                    'error': 'Invalid prices',
-                    'slippage_percent': 0
-                }
-            
-            # Calculate price difference
-            price_diff = actual_price - expected_price
-            
-            # For buys: negative slippage = better price (bought cheaper)
-            # For sells: positive slippage = better price (sold higher)
-            if side == 'buy':
-                slippage_percent = (price_diff / expected_price) * 100
-                favorable = price_diff < 0
-            else:  # sell
-                slippage_percent = (-price_diff / expected_price) * 100
-                favorable = price_diff > 0
-            
-            # Determine if within acceptable limits
-            is_acceptable = abs(slippage_percent) <= SlippageProtection.MAX_SLIPPAGE_PERCENT
-            is_warning = abs(slippage_percent) >= SlippageProtection.WARNING_SLIPPAGE_PERCENT
-            
-            result = {
-                'valid': is_acceptable,
-                'slippage_percent': round(slippage_percent, 3),
-                'slippage_amount': round(abs(price_diff), 2),
-                'expected_price': expected_price,
-                'actual_price': actual_price,
-                'favorable': favorable,
-                'status': 'ACCEPTABLE' if is_acceptable else 'EXCESSIVE'
+        # Positive and finite (comparisons with NaN are False, so NaN is rejected too)
+        if not (0 < expected_price < math.inf and 0 < actual_price < math.inf):
+            return {
+                'valid': False,
+                'error': 'Invalid prices',
+                'slippage_percent': 0
             }
-            
-            # Log results
-            emoji = "✅" if is_acceptable else "⚠️"
-            direction = "favorable" if favorable else "unfavorable"
-            
-            if is_acceptable:
+        
+        # Calculate price difference
+        price_diff = actual_price - expected_price
+        
+        # Signed so that negative slippage is always the better price:
+        # buys filled cheaper, sells filled higher
+        sign = 1.0 if side == 'buy' else -1.0
+        slippage_percent = sign * price_diff / expected_price * 100
+        favorable = slippage_percent < 0
+        
+        # Determine if within acceptable limits
+        is_acceptable = abs(slippage_percent) <= _MAX_SLIPPAGE_PERCENT
+        is_warning = abs(slippage_percent) >= _WARNING_SLIPPAGE_PERCENT
+        
+        result = {
+            'valid': is_acceptable,
+            'slippage_percent': slippage_percent,
+            'slippage_amount': abs(price_diff),
+            'expected_price': expected_price,
+            'actual_price': actual_price,
+            'favorable': favorable,
+            'status': 'ACCEPTABLE' if is_acceptable else 'EXCESSIVE'
+        }
+        
+        # Log results (acceptable fills are only described if their level is enabled)
+        if is_acceptable:
+            if logger.isEnabledFor(logging.WARNING if is_warning else logging.INFO):
+                direction = "favorable" if favorable else "unfavorable"
                 if is_warning:
                     logger.warning(
-                        f"{emoji} Slippage: {slippage_percent:+.3f}% ({direction})\n"
-                        f"   Expected: ${expected_price:.2f}, Got: ${actual_price:.2f}"
+                        "✅ Slippage: %+.3f%% (%s)\n"
+                        "   Expected: $%.2f, Got: $%.2f",
+                        slippage_percent, direction, expected_price, actual_price
                     )
                 else:
-                    logger.info(
-                        f"{emoji} Slippage: {slippage_percent:+.3f}% ({direction})"
-                    )
+                    logger.info("✅ Slippage: %+.3f%% (%s)", slippage_percent, direction)
+        else:
+            logger.error(
+                "❌ EXCESSIVE SLIPPAGE: %+.3f%% (%s)\n"
+                "   Expected: $%.2f, Got: $%.2f\n"
+                "   Maximum allowed: ±%s%%",
+                slippage_percent, "favorable" if favorable else "unfavorable",
+                expected_price, actual_price, _MAX_SLIPPAGE_PERCENT
+            )
+        
+        return result
+    
+    @staticmethod
+    def calculate_slippage_batch(
+        expected_prices: Sequence[float],
+        actual_prices: Sequence[float],
+        sides: Sequence[str]
+    ) -> Dict[str, List]:
+        """
+        Calculate slippage for many fills at once (e.g. a websocket fill batch)
+        
+        Same formula and limit as calculate_slippage, without per-fill result
+        dicts or logging; excessive fills are summarised in one log line.
+        Fills with non-positive or non-finite prices are reported as invalid
+        with 0 slippage, matching calculate_slippage's invalid-price result.
+        
+        Args:
+            expected_prices: Expected execution price per fill
+            actual_prices: Actual execution price per fill
+            sides: 'buy' or 'sell' per fill
+        
+        Returns:
+            Dict of parallel lists: valid, slippage_percent, favorable
+        """
+        max_slippage = _MAX_SLIPPAGE_PERCENT
+        valid = []
+        slippage_percents = []
+        favorable = []
+        
+        for expected_price, actual_price, side in zip(expected_prices, actual_prices, sides):
+            # Same positive-and-finite guard as calculate_slippage (rejects NaN too)
+            if 0 < expected_price < math.inf and 0 < actual_price < math.inf:
+                sign = 1.0 if side == 'buy' else -1.0
+                slippage_percent = sign * (actual_price - expected_price) / expected_price * 100
+                valid.append(abs(slippage_percent) <= max_slippage)
+                slippage_percents.append(slippage_percent)
+                favorable.append(slippage_percent < 0)
             else:
-                logger.error(
-                    f"❌ EXCESSIVE SLIPPAGE: {slippage_percent:+.3f}% ({direction})\n"
-                    f"   Expected: ${expected_price:.2f}, Got: ${actual_price:.2f}\n"
-                    f"   Maximum allowed: ±{SlippageProtection.MAX_SLIPPAGE_PERCENT}%"
-                )
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"Error calculating slippage: {e}")
-            return {
-                'valid': False,
-                'error': str(e),
-                'slippage_percent': 0
-            }
+                valid.append(False)
+                slippage_percents.append(0)
+                favorable.append(False)
+        
+        rejected = valid.count(False)
+        if rejected:
+            first = valid.index(False)
+            logger.error(
+                "❌ EXCESSIVE SLIPPAGE on %d/%d fills (first: #%d, %+.3f%%)",
+                rejected, len(valid), first, slippage_percents[first]
+            )
+        
+        return {
+            'valid': valid,
+            'slippage_percent': slippage_percents,
+            'favorable': favorable
+        }
+    
+    @staticmethod
+    def is_execution_acceptable(expected_price: float, actual_price: float) -> bool:
+        """
+        Fast check that slippage is within limits (no logging, no result dict)
+        
+        The limit is symmetric, so the side doesn't matter here.
+        """
+        if expected_price > 0 and actual_price > 0:
+            slippage_percent = (actual_price - expected_price) / expected_price * 100
+            return abs(slippage_percent) <= _MAX_SLIPPAGE_PERCENT
+        return False
     
     @staticmethod
     def validate_execution(
@@ -119,13 +184,18 @@ class SlippageProtection:
         Returns:
             True if acceptable, False otherwise
         """
+        if SlippageProtection.is_execution_acceptable(expected_price, actual_price):
+            return True
+        
+        # Slow path only for rejections, to log the details
         result = SlippageProtection.calculate_slippage(expected_price, actual_price, side)
         
         if not result['valid'] and auto_reject:
             logger.error(
-                f"🚫 TRADE REJECTED due to excessive slippage\n"
-                f"   Slippage: {result['slippage_percent']}%\n"
-                f"   Threshold: {SlippageProtection.MAX_SLIPPAGE_PERCENT}%"
+                "🚫 TRADE REJECTED due to excessive slippage\n"
+                "   Slippage: %+.3f%%\n"
+                "   Threshold: %s%%",
+                result['slippage_percent'], _MAX_SLIPPAGE_PERCENT
             )
             return False
         
@@ -139,145 +209,477 @@ class RateLimiter:
     Prevents hitting exchange API rate limits
     """
     
-    def __init__(self, calls_per_second: float = 10, burst: int = 20):
+    def __init__(
+        self,
+        calls_per_second: float = 10,
+        burst: int = 20,
+        min_rate: float = 0.5,
+        increase_step: float = 0.5,
+        decrease_factor: float = 0.5
+    ):
         """
         Initialize rate limiter
         
+        The rate adapts to exchange throttling (AIMD): each successful call adds
+        increase_step calls/s, each rate-limit error multiplies the rate by
+        decrease_factor. The rate stays within [min_rate, calls_per_second].
+        
         Args:
             calls_per_second: Maximum sustained calls per second
             burst: Maximum burst calls allowed
+            min_rate: Lowest rate the limiter backs off to
+            increase_step: Calls/s added after each successful call
+            decrease_factor: Rate multiplier applied on a rate-limit error
         """
         self.calls_per_second = calls_per_second
+        self.max_rate = calls_per_second
+        self.min_rate = min(min_rate, calls_per_second)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
         self.burst = burst
-        self.tokens = burst  # Start with full burst capacity
-        self.last_update = time.time()
-        self.call_history = deque(maxlen=1000)  # Track last 1000 calls
-        self.lock = asyncio.Lock()
+        # Earliest start time for the next call (GCRA theoretical arrival time).
+        # Only advanced synchronously when a slot is granted, so no lock is needed.
+        self._next = 0.0  # Far in the past: start with full burst capacity
+        # Callers waiting for a slot, in arrival order, and the one timer that serves them all
+        self._waiters = deque()
+        self._wake_handle = None
+        self.call_history = deque()  # Start times of calls in the last minute, oldest first
+    
+    @property
+    def tokens(self) -> float:
+        """Calls that could start right now without waiting"""
+        available = (time.monotonic() - self._next) * self.calls_per_second + 1
+        return max(0.0, min(self.burst, available))
+    
+    def try_acquire_nowait(self) -> bool:
+        """
+        Take a slot only if one is free right now (never waits)
+        
+        Returns:
+            True if a slot was taken, False if the caller must await acquire()
+        """
+        # Never jump ahead of callers already queued in acquire()
+        if self._waiters:
+            return False
+        return self._take_slot(time.monotonic())
+    
+    def _slot_start(self, now: float) -> float:
+        """Start time of the next free slot; after an idle period up to `burst` calls start back to back"""
+        return max(self._next, now - (self.burst - 1) / self.calls_per_second)
+    
+    def _take_slot(self, now: float) -> bool:
+        """Grant the next slot if it is due at `now`"""
+        start = self._slot_start(now)
+        if start > now:
+            return False
+        
+        self._next = start + 1 / self.calls_per_second
+        self._record_call(now)
+        return True
     
     async def acquire(self):
-        """Acquire a token to make an API call"""
-        async with self.lock:
-            now = time.time()
-            
-            # Refill tokens based on time elapsed
-            time_passed = now - self.last_update
-            self.tokens = min(
-                self.burst,
-                self.tokens + time_passed * self.calls_per_second
-            )
-            self.last_update = now
-            
-            # Wait if no tokens available
-            if self.tokens < 1:
-                wait_time = (1 - self.tokens) / self.calls_per_second
-                logger.warning(f"⏳ Rate limit: waiting {wait_time:.2f}s...")
-                await asyncio.sleep(wait_time)
-                self.tokens = 1
-            
-            # Consume one token
-            self.tokens -= 1
-            self.call_history.append(now)
+        """Acquire a slot to make an API call"""
+        if self.try_acquire_nowait():
+            return
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._schedule_wake()
+        
+        if logger.isEnabledFor(logging.WARNING):
+            now = time.monotonic()
+            wait_time = self._slot_start(now) - now + (len(self._waiters) - 1) / self.calls_per_second
+            logger.warning("⏳ Rate limit: waiting %.2fs...", wait_time)
+        
+        # Resolved by _wake once the slot is ours; a cancelled waiter is skipped there
+        await waiter
+    
+    def _schedule_wake(self):
+        """Arm the shared timer for the head of the queue, unless it is already armed"""
+        if self._wake_handle is not None or not self._waiters:
+            return
+        
+        now = time.monotonic()
+        delay = max(0.0, self._slot_start(now) - now)
+        self._wake_handle = self._waiters[0].get_loop().call_later(delay, self._wake)
+    
+    def _wake(self):
+        """Grant every slot that is due to queued callers, oldest first, then re-arm"""
+        self._wake_handle = None
+        now = time.monotonic()
+        waiters = self._waiters
+        
+        while waiters:
+            if waiters[0].done():
+                waiters.popleft()  # Cancelled while waiting
+                continue
+            if not self._take_slot(now):
+                break
+            waiters.popleft().set_result(None)
+        
+        self._schedule_wake()
+    
+    def _record_call(self, now: float):
+        """Add a call to the last-minute history"""
+        self.call_history.append(now)
+        self._evict_history(now)
+    
+    def set_rate(self, calls_per_second: float):
+        """
+        Change the rate and re-arm the wakeup timer for queued callers
+        
+        On an increase the spacing already owed at the old rate is dropped; on
+        a decrease the next slot is pushed out to at least one new interval
+        from now, so a throttled limiter never releases a call immediately.
+        Slots are only taken when granted, so waiters keep their place in the
+        queue and are simply served at the new rate.
+        """
+        now = time.monotonic()
+        if calls_per_second > self.calls_per_second:
+            self._next = min(self._next, now)
+        else:
+            self._next = max(self._next, now + 1 / calls_per_second)
+        self.calls_per_second = calls_per_second
+        
+        if self._wake_handle is not None:
+            self._wake_handle.cancel()
+            self._wake_handle = None
+        self._schedule_wake()
+    
+    def on_success(self):
+        """Additively raise the rate after a successful call"""
+        # Picked up at the next wakeup - re-arming the timer per success would thrash
+        if self.calls_per_second < self.max_rate:
+            self.calls_per_second = min(self.max_rate, self.calls_per_second + self.increase_step)
+    
+    def on_failure(self):
+        """Multiplicatively cut the rate after the exchange throttled a call"""
+        self.set_rate(max(self.min_rate, self.calls_per_second * self.decrease_factor))
+        logger.warning("🐢 Rate limited by exchange, slowing to %.2f calls/s", self.calls_per_second)
+    
+    def _evict_history(self, now: float):
+        """Drop calls older than a minute (history is in time order, so only the head)"""
+        history = self.call_history
+        while history and now - history[0] >= 60:
+            history.popleft()
     
     def get_stats(self) -> Dict:
         """Get rate limiting statistics"""
-        now = time.time()
-        recent_calls = [t for t in self.call_history if now - t < 60]  # Last minute
+        self._evict_history(time.monotonic())
         
         return {
             'tokens_available': round(self.tokens, 2),
-            'calls_last_minute': len(recent_calls),
+            'calls_last_minute': len(self.call_history),
             'calls_per_second_limit': self.calls_per_second,
+            'max_calls_per_second': self.max_rate,
             'burst_capacity': self.burst
         }
 
 
+class RateLimiterGroup:
+    """
+    Independent rate limiters per bucket key (e.g. per endpoint)
+    
+    Lets order submission and market data each use their own quota, so a
+    burst on one bucket doesn't starve the others. Limiters are created on
+    first use.
+    """
+    
+    def __init__(
+        self,
+        default_rate: float = 10,
+        default_burst: int = 20,
+        bucket_config: Optional[Dict[str, Tuple[float, int]]] = None
+    ):
+        """
+        Initialize limiter group
+        
+        Args:
+            default_rate: calls_per_second for buckets without their own config
+            default_burst: burst for buckets without their own config
+            bucket_config: Optional {key: (calls_per_second, burst)} overrides
+        """
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.bucket_config = bucket_config or {}
+        self._buckets: Dict[str, RateLimiter] = {}
+    
+    def get(self, key: str) -> RateLimiter:
+        """Get (creating if needed) the limiter for a bucket"""
+        limiter = self._buckets.get(key)
+        if limiter is None:
+            # No await between lookup and insert, so this is race-free under asyncio
+            rate, burst = self.bucket_config.get(key, (self.default_rate, self.default_burst))
+            limiter = self._buckets[key] = RateLimiter(calls_per_second=rate, burst=burst)
+        return limiter
+    
+    async def acquire(self, key: str):
+        """Acquire a slot from the limiter for a bucket"""
+        limiter = self.get(key)
+        if not limiter.try_acquire_nowait():
+            await limiter.acquire()
+    
+    def get_stats(self) -> Dict[str, Dict]:
+        """Get rate limiting statistics per bucket"""
+        return {key: limiter.get_stats() for key, limiter in self._buckets.items()}
+
+
+class AsyncBatcher:
+    """
+    Coalesces concurrent requests into batched calls behind a rate limiter
+    
+    Items submitted within max_delay of each other (up to max_batch) are
+    sent as one flush_call(items), which consumes a single limiter slot.
+    Each submitter gets back its own element of the returned results.
+    """
+    
+    def __init__(
+        self,
+        flush_call: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch: int = 20,
+        max_delay: float = 0.02,
+        limiter: Optional[RateLimiter] = None
+    ):
+        """
+        Initialize batcher
+        
+        Args:
+            flush_call: Async callable taking a list of items and returning
+                one result per item, in the same order
+            max_batch: Flush as soon as this many items are pending
+            max_delay: Longest time (seconds) an item waits for companions
+            limiter: RateLimiter to acquire once per batch
+        """
+        self.flush_call = flush_call
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.limiter = limiter
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes = set()  # Keep running flush tasks referenced
+    
+    async def submit(self, item: Any) -> Any:
+        """Queue an item for the next batch and wait for its result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        
+        if len(self._pending) >= self.max_batch:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._start_flush)
+        
+        return await future
+    
+    def _start_flush(self):
+        """Hand the pending items to a flush task"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._flush(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+    
+    async def _flush(self, batch: List[Tuple[Any, asyncio.Future]]):
+        """Send one batch and route each result (or the error) to its submitter"""
+        try:
+            if self.limiter is not None and not self.limiter.try_acquire_nowait():
+                await self.limiter.acquire()
+            results = await self.flush_call([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Batch call returned {len(results)} results for {len(batch)} items")
+        except asyncio.CancelledError:
+            # Flush cancelled (shutdown): cancel the submitters too rather than leave them waiting forever
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            logger.error("❌ Batch of %d failed: %s", len(batch), e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        if self.limiter is not None:
+            self.limiter.on_success()
+        
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+# Shared per-exchange limiters, created on first use: {name: (calls_per_second, burst)}
+_LIMITER_CONFIG: Dict[str, Tuple[float, int]] = {
+    'hyperliquid': (10, 20),
+    'bybit': (5, 10),
+}
+_LIMITERS: Dict[str, RateLimiter] = {}
+
+
+def get_limiter(name: str) -> RateLimiter:
+    """
+    Get (creating if needed) the shared rate limiter for an exchange
+    
+    Args:
+        name: Key in _LIMITER_CONFIG (e.g. 'hyperliquid', 'bybit')
+    
+    Returns:
+        The same RateLimiter instance for every call with this name
+    """
+    limiter = _LIMITERS.get(name)
+    if limiter is None:
+        rate, burst = _LIMITER_CONFIG[name]
+        limiter = _LIMITERS[name] = RateLimiter(calls_per_second=rate, burst=burst)
+    return limiter
+
+
+def _resolve_limiter(limiter: Union[RateLimiter, str]) -> RateLimiter:
+    """Accept either a RateLimiter or the name of a shared one"""
+    return limiter if isinstance(limiter, RateLimiter) else get_limiter(limiter)
+
+
 def with_retry(
     max_attempts: int = 3,
     backoff_base: float = 2,
     backoff_max: float = 60,
-    retry_on: tuple = (Exception,)
+    retry_on: tuple = (Exception,),
+    limiter: Optional[Union[RateLimiter, str]] = None,
+    jitter: str = 'full'
 ):
     """
     Decorator to retry function with exponential backoff
     
     Args:
-        max_attempts: Maximum retry attempts
+        max_attempts: Maximum attempts (at least 1)
         backoff_base: Base for exponential backoff (2 = double each time)
         backoff_max: Maximum wait time between retries
         retry_on: Tuple of exceptions to retry on
+        limiter: RateLimiter (or shared limiter name) to slow down when a
+            rate-limit error is seen
+        jitter: 'full' to wait a random time up to the backoff after a rate-limit
+            error (so throttled callers don't retry in lockstep), 'none' to wait
+            the exact backoff
     
     Example:
         @with_retry(max_attempts=3)
         async def api_call():
             ...
     """
+    # The retry loop must run at least once, or the wrapper would return None
+    if max_attempts < 1:
+        raise ValueError(f"max_attempts must be at least 1, got {max_attempts}")
+    
+    if limiter is not None:
+        limiter = _resolve_limiter(limiter)
+    
     def decorator(func: Callable):
+        # Nothing to retry (and no limiter to report to): don't wrap at all
+        if max_attempts <= 1 and limiter is None:
+            return func
+        
+        # Resolved once per decorated function instead of on every failure
+        func_name = func.__name__
+        full_jitter = jitter == 'full'
+        is_rate_limit_error = _RATE_LIMIT_RE.search
+        
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            last_exception = None
-            
             for attempt in range(1, max_attempts + 1):
                 try:
                     return await func(*args, **kwargs)
                     
                 except retry_on as e:
-                    last_exception = e
-                    
                     # Check if it's a rate limit error
-                    error_msg = str(e).lower()
-                    is_rate_limit = any(keyword in error_msg for keyword in [
-                        'rate limit', 'too many requests', '429', 'throttle'
-                    ])
+                    is_rate_limit = is_rate_limit_error(str(e)) is not None
+                    
+                    if is_rate_limit and limiter is not None:
+                        limiter.on_failure()
                     
                     if attempt >= max_attempts:
                         logger.error(
-                            f"❌ {func.__name__} failed after {max_attempts} attempts: {e}"
+                            "❌ %s failed after %d attempts: %s", func_name, max_attempts, e
                         )
                         raise
                     
                     # Calculate wait time with exponential backoff
                     if is_rate_limit:
                         wait_time = min(backoff_base ** attempt, backoff_max)
+                        if full_jitter:
+                            wait_time = random.uniform(0, wait_time)
                     else:
                         wait_time = min(backoff_base ** (attempt - 1), backoff_max)
                     
                     logger.warning(
-                        f"⚠️ {func.__name__} attempt {attempt}/{max_attempts} failed: {e}\n"
-                        f"   Retrying in {wait_time:.1f}s..."
+                        "⚠️ %s attempt %d/%d failed: %s\n"
+                        "   Retrying in %.1fs...",
+                        func_name, attempt, max_attempts, e, wait_time
                     )
-                    
-                    await asyncio.sleep(wait_time)
-            
-            # Should never reach here, but just in case
-            raise last_exception
+                
+                # Back off outside the except block, so the failed attempt's
+                # exception and traceback are released before sleeping
+                await asyncio.sleep(wait_time)
         
         return wrapper
     return decorator
 
 
-def with_rate_limit(limiter: RateLimiter):
+def with_rate_limit(limiter: Union[RateLimiter, str]):
     """
     Decorator to enforce rate limiting on function
     
     Args:
-        limiter: RateLimiter instance
+        limiter: RateLimiter instance, or the name of a shared one (see get_limiter)
     
     Example:
-        limiter = RateLimiter(calls_per_second=5)
-        
-        @with_rate_limit(limiter)
+        @with_rate_limit('bybit')
         async def api_call():
             ...
     """
+    limiter = _resolve_limiter(limiter)
+    
     def decorator(func: Callable):
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            await limiter.acquire()
-            return await func(*args, **kwargs)
+            if not limiter.try_acquire_nowait():
+                await limiter.acquire()
+            result = await func(*args, **kwargs)
+            limiter.on_success()
+            return result
+        return wrapper
+    return decorator
+
+
+def with_rate_limit_for(group: RateLimiterGroup, key_fn: Callable[..., str]):
+    """
+    Decorator to enforce per-bucket rate limiting on function
+    
+    Args:
+        group: RateLimiterGroup holding the buckets
+        key_fn: Called with the function's arguments, returns the bucket key
+    
+    Example:
+        limits = RateLimiterGroup(bucket_config={'order': (5, 10), 'info': (20, 40)})
+        
+        @with_rate_limit_for(limits, lambda self, endpoint, *a, **kw: endpoint)
+        async def api_call(self, endpoint, payload):
+            ...
+    """
+    def decorator(func: Callable):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            limiter = group.get(key_fn(*args, **kwargs))
+            if not limiter.try_acquire_nowait():
+                await limiter.acquire()
+            result = await func(*args, **kwargs)
+            limiter.on_success()
+            return result
         return wrapper
     return decorator
 
 
 # Global rate limiters for different exchanges
-hyperliquid_limiter = RateLimiter(calls_per_second=10, burst=20)
-bybit_limiter = RateLimiter(calls_per_second=5, burst=10)
+hyperliquid_limiter = get_limiter('hyperliquid')
+bybit_limiter = get_limiter('bybit')